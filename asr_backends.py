@@ -0,0 +1,180 @@
+import os
+import json
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+VOSK_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vosk-model-small-en-us-0.15')
+
+
+def load_wav(path):
+    # 16-bit PCM WAV -> mono float32 at 16 kHz
+    with wave.open(path, 'rb') as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        raw = f.readframes(f.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: expected 16-bit PCM, got {width * 8}-bit")
+    audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def to_pcm16(audio):
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+
+class ASRBackend:
+    # Every backend takes mono float32 audio at 16 kHz and returns plain text
+    name = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio):
+        raise NotImplementedError
+
+
+class WhisperBackend(ASRBackend):
+    # language: e.g. 'en' skips Whisper's language detection; None detects it per utterance
+    def __init__(self, model_name='base', cpu_optimized=False, threads=None, language=None):
+        self.name = f"whisper-{model_name}" + ("-int8" if cpu_optimized else "")
+        self.model_name = model_name
+        self.cpu_optimized = cpu_optimized
+        self.threads = threads
+        self.language = language
+        self.model = None
+
+    def load(self):
+        import whisper
+        if not self.cpu_optimized:
+            self.model = whisper.load_model(self.model_name)
+            return
+        import torch
+        torch.set_num_threads(self.threads or default_threads())
+        model = whisper.load_model(self.model_name, device='cpu')
+        self.model = quantize_whisper(model)
+        allow_short_audio(self.model)
+
+    def transcribe(self, audio):
+        if self.cpu_optimized and len(audio) <= SHORT_UTTERANCE_SECONDS * SAMPLE_RATE:
+            return transcribe_short(self.model, audio, self.language)
+        return self.model.transcribe(audio, fp16=not self.cpu_optimized, language=self.language)["text"].strip()
+
+
+# ================== Whisper on CPU ==================
+SHORT_UTTERANCE_SECONDS = 10
+SHORT_PADDING_FRAMES = 100  # one second of mel frames so the decoder sees the utterance end
+
+
+def default_threads():
+    # Hyper-threads share a core's vector units, which is what these matmuls saturate
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def quantize_whisper(model):
+    # quantize_dynamic only converts exact nn.Linear modules, and Whisper uses its own
+    # subclass, so swap those for plain nn.Linear first (same parameters, no copy).
+    import torch
+    from torch import nn
+
+    for module in list(model.modules()):
+        for child_name, child in module.named_children():
+            if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight, plain.bias = child.weight, child.bias
+                setattr(module, child_name, plain)
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def allow_short_audio(model):
+    # The stock encoder insists on a full 30 s window (3000 mel frames). Slicing the
+    # positional embedding lets it encode just the utterance, which for a 3 s command
+    # is a tenth of the encoder work and a much shorter cross-attention for the decoder.
+    import torch.nn.functional as F
+
+    encoder = model.encoder
+
+    def forward(x):
+        x = F.gelu(encoder.conv1(x))
+        x = F.gelu(encoder.conv2(x))
+        x = x.permute(0, 2, 1)
+        x = (x + encoder.positional_embedding[:x.shape[1]]).to(x.dtype)
+        for block in encoder.blocks:
+            x = block(x)
+        return encoder.ln_post(x)
+
+    encoder.forward = forward
+
+
+def transcribe_short(model, audio, language=None):
+    import torch
+    import whisper
+
+    mel = whisper.log_mel_spectrogram(torch.from_numpy(audio), model.dims.n_mels)
+    frames = min(whisper.audio.N_FRAMES, mel.shape[-1] + SHORT_PADDING_FRAMES)
+    frames += frames % 2  # the encoder's second conv has stride 2
+    mel = whisper.pad_or_trim(mel, frames)
+    options = whisper.DecodingOptions(language=language, fp16=False, without_timestamps=True)
+    with torch.inference_mode():
+        result = whisper.decode(model, mel, options)
+    return result.text.strip()
+
+
+class VoskBackend(ASRBackend):
+    name = 'vosk'
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        self.model_path = model_path
+        self.model = None
+
+    def load(self):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        self.model = Model(self.model_path)
+
+    def transcribe(self, audio):
+        from vosk import KaldiRecognizer
+        recognizer = KaldiRecognizer(self.model, SAMPLE_RATE)
+        recognizer.AcceptWaveform(to_pcm16(audio))
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+class PocketSphinxBackend(ASRBackend):
+    name = 'pocketsphinx'
+
+    def __init__(self):
+        self.decoder = None
+
+    def load(self):
+        from pocketsphinx import Decoder
+        self.decoder = Decoder(samprate=SAMPLE_RATE)
+
+    def transcribe(self, audio):
+        self.decoder.start_utt()
+        self.decoder.process_raw(to_pcm16(audio), full_utt=True)
+        self.decoder.end_utt()
+        hypothesis = self.decoder.hyp()
+        return hypothesis.hypstr if hypothesis else ""
+
+
+BACKENDS = {
+    'whisper-tiny': lambda: WhisperBackend('tiny'),
+    'whisper-base': lambda: WhisperBackend('base'),
+    'whisper-small': lambda: WhisperBackend('small'),
+    'whisper-tiny-int8': lambda: WhisperBackend('tiny', cpu_optimized=True),
+    'whisper-base-int8': lambda: WhisperBackend('base', cpu_optimized=True),
+    'whisper-small-int8': lambda: WhisperBackend('small', cpu_optimized=True),
+    'vosk': VoskBackend,
+    'pocketsphinx': PocketSphinxBackend,
+}
+
+
+def create_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
@@ -0,0 +1,85 @@
+import sys
+import json
+import time
+import argparse
+
+from assistant_engine import DB_URL, AssistantEngine
+
+
+class ConsoleAssistant(AssistantEngine):
+    # Prints replies as they are spoken; --quiet leaves the output to the summary lines
+    def __init__(self, echo=True, **kwargs):
+        super().__init__(**kwargs)
+        self.echo = echo
+
+    def on_reply(self, text):
+        if self.echo:
+            print(f"  {text}", flush=True)
+
+
+def read_commands(args):
+    if args.commands:
+        return args.commands
+    f = sys.stdin if args.file in (None, '-') else open(args.file, encoding='utf-8')
+    with f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+def run(assistant, commands, as_json=False):
+    # The whole batch is classified in one call; the engine still consults its command cache first
+    predictions = assistant.processor.classify_batch(commands) if len(commands) > 1 else [None] * len(commands)
+    timings = []
+    failed = 0
+    for command, prediction in zip(commands, predictions):
+        if not as_json:
+            print(f"> {command}", flush=True)
+        start = time.perf_counter()
+        result = assistant.process_command(command, prediction)
+        seconds = time.perf_counter() - start
+        timings.append(seconds)
+        failed += result.intent is None
+        if as_json:
+            print(json.dumps({'command': command, 'intent': result.intent, 'replies': result.replies,
+                              'ms': round(seconds * 1000, 3)}), flush=True)
+    return timings, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run assistant commands without the GUI")
+    parser.add_argument('commands', nargs='*', help="commands to run; read from --file or stdin when omitted")
+    parser.add_argument('-f', '--file', help="one command per line ('#' starts a comment, '-' is stdin)")
+    parser.add_argument('--dry-run', action='store_true', help="find files but do not open, copy, move or delete them")
+    parser.add_argument('--allow-destructive', action='store_true',
+                        help="let commands delete, copy and move files (refused otherwise)")
+    parser.add_argument('--refresh-index', action='store_true', help="bring the filename index up to date first")
+    parser.add_argument('--online', action='store_true', help="classify with the online-learning model")
+    parser.add_argument('--db', default=DB_URL)
+    parser.add_argument('--json', action='store_true', help="one JSON object per command instead of text")
+    parser.add_argument('--stats', action='store_true', help="print latency figures to stderr at the end")
+    args = parser.parse_args()
+
+    commands = read_commands(args)
+    if not commands:
+        parser.error("no commands given")
+    assistant = ConsoleAssistant(echo=not args.json, db_url=args.db, online=args.online, dry_run=args.dry_run,
+                                 allow_destructive=args.allow_destructive)
+    if args.refresh_index:
+        assistant.update_index()
+
+    start = time.perf_counter()
+    try:
+        timings, failed = run(assistant, commands, args.json)
+    finally:
+        assistant.close()
+    if args.stats:
+        ordered = sorted(timings)
+        print(f"{len(timings)} commands in {time.perf_counter() - start:.3f}s: "
+              f"p50 {ordered[len(ordered) // 2] * 1000:.2f}ms  "
+              f"p95 {ordered[int(len(ordered) * 0.95)] * 1000:.2f}ms  "
+              f"max {ordered[-1] * 1000:.2f}ms  failed {failed}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
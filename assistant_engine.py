@@ -0,0 +1,686 @@
+import os
+import re
+import time
+import shutil
+import pickle
+import threading
+import subprocess
+from collections import namedtuple
+from datetime import datetime
+import send2trash
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker, relationship
+from file_index import INDEX_PATH, FileIndex
+from file_watcher import FileWatcher
+from media_catalog import MediaCatalog
+from fuzzy_index import MIN_CANDIDATE_SIMILARITY, FuzzyFinder
+from file_search import ParallelSearch, CancelToken, SearchCancelled, SearchTimeout
+from intent_model import COMPACT_MODEL_PATH, CompactIntentModel
+from command_cache import CommandCache, CachedCommand
+from entity_extractor import EntityExtractor
+from preprocessing import preprocess_text, warm_up as warm_up_preprocessing
+from online_model import OnlineIntentModel
+from history_writer import HistoryWriter
+
+# ================== Database Setup ==================
+Base = declarative_base()
+
+class User(Base):
+    __tablename__ = 'users'
+    id = Column(Integer, primary_key=True)
+    username = Column(String(50), unique=True)
+    commands = relationship('CommandHistory', back_populates='user')
+
+class CommandHistory(Base):
+    __tablename__ = 'command_history'
+    id = Column(Integer, primary_key=True)
+    command_text = Column(Text)
+    intent = Column(String(50))
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    user = relationship('User', back_populates='commands')
+
+class IntentFeedback(Base):
+    # The intent the user confirmed for a logged command; what online learning trains on
+    __tablename__ = 'intent_feedback'
+    id = Column(Integer, primary_key=True)
+    history_id = Column(Integer, ForeignKey('command_history.id'))
+    intent = Column(String(50))
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    history = relationship('CommandHistory')
+
+# ================== Core Functionality ==================
+# Data files live next to the code, so the assistant runs the same from any working directory
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(PACKAGE_DIR, 'file_assistant_model.pkl')
+COMMANDS_CSV = os.path.join(PACKAGE_DIR, 'commands.csv')
+DB_URL = f"sqlite:///{os.path.join(PACKAGE_DIR, 'assistant.db')}"
+
+SEARCH_TIMEOUT = 60  # seconds before an unindexed disk search gives up
+MEDIA_SELECTION = 'least_recently_played'  # or 'random' / 'most_recent'
+CLARIFY_CONFIDENCE = 0.25  # below this the assistant asks which intent was meant (or, unattended, does nothing)
+DESTRUCTIVE_INTENTS = ('delete_file', 'delete_forever', 'copy_file', 'move_file')  # can lose or overwrite data
+ONLINE_LEARNING = False  # classify with a model updated from clarified commands (imports sklearn)
+CORRECTION = re.compile(r"^(?:no|nope)\W*\s*i\s+meant\s+(?:to\s+)?(.+?)\W*$", re.IGNORECASE)  # "No, I meant play music"
+
+class DatabaseManager:
+    def __init__(self, db_url=DB_URL):
+        self.engine = create_engine(db_url)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+    
+    def get_session(self):
+        return self.Session()
+
+class FileManager:
+    def __init__(self, index=None, watcher=None):
+        self.index = index
+        self.watcher = watcher
+        self.fuzzy = FuzzyFinder(index) if index is not None else None
+        self.searcher = ParallelSearch()
+
+    @staticmethod
+    def system_folders():
+        home = os.path.expanduser('~')
+        return {
+            'music': os.path.join(home, 'Music'),
+            'documents': os.path.join(home, 'Documents'),
+            'downloads': os.path.join(home, 'Downloads'),
+            'desktop': os.path.join(home, 'Desktop'),
+            'pictures': os.path.join(home, 'Pictures'),
+            'videos': os.path.join(home, 'Videos')
+        }
+
+    @staticmethod
+    def search_paths():
+        return [
+            os.path.join(os.path.expanduser('~'), 'Desktop'),
+            os.path.join(os.path.expanduser('~'), 'Documents'),
+            os.path.join(os.path.expanduser('~'), 'Downloads'),
+            os.path.join(os.path.expanduser('~'), 'Music'),
+            'D:\\Desktop\\backup as\\music',  # Custom music path
+            'D:\\',  # Direct D drive access
+            'C:\\Users\\'  # Windows user directory
+        ]
+
+    @staticmethod
+    def drives():
+        return ['C:\\', 'D:\\', 'E:\\'] if os.name == 'nt' else ['/']
+
+    @classmethod
+    def watch_roots(cls):
+        # Where new files usually turn up: the priority locations and every standard user
+        # folder (Videos and Pictures are only indexed through the filesystem root otherwise)
+        roots = cls.search_paths()
+        return roots + [path for path in cls.system_folders().values() if path not in roots]
+
+    @classmethod
+    def search_roots(cls):
+        return cls.search_paths() + cls.drives()
+
+    def find_file_or_folder(self, name, file_type='file', cancel=None, timeout=SEARCH_TIMEOUT, fuzzy=True):
+        # fuzzy=False keeps the index to files named exactly `name`; callers about to delete
+        # or move what comes back must not get a merely similar file (the disk search still
+        # matches substrings, so they check the name of what comes back)
+        # 1. Check system folders first
+        system_folders = self.system_folders()
+        if name.lower() in system_folders:
+            path = system_folders[name.lower()]
+            if os.path.exists(path):
+                return path
+
+        # 2. Filename index, when one has been built
+        if self.index is not None and self.index.is_built():
+            path = self.index.find(name, file_type) if fuzzy else self.index.find_named(name, file_type)
+            if path is None and fuzzy:
+                # Nothing contains the name verbatim (e.g. a mistranscribed word): take the closest ranked match
+                path = self.fuzzy.best_match(name, file_type)
+            if path is not None:
+                if os.path.exists(path):
+                    return path
+                self.index.remove(path)
+
+        # 3. Search priority locations, then the full system. An index miss isn't final:
+        # the file may be newer than the index's last look at its directory.
+        deadline = time.monotonic() + timeout if timeout else None
+        return self.searcher.find(self.search_roots(), name, file_type, deadline=deadline, cancel=cancel)
+
+    def find_destination(self, name):
+        # Places a spoken destination can safely mean without asking: a system folder, or a
+        # folder of exactly that name in one of the priority locations
+        path = self.system_folders().get(name.lower())
+        if path and os.path.isdir(path):
+            return path
+        for root in self.search_paths():
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        if entry.name.lower() == name.lower() and entry.is_dir():
+                            return entry.path
+            except OSError:
+                continue
+        if self.index is not None and self.index.is_built():
+            return self.index.find_named(name, 'folder', self.index.priority_ranks())
+        return None
+
+    def find_candidates(self, name, file_type='file', k=5):
+        if self.fuzzy is None:
+            return []
+        return [path for path, similarity, score in self.fuzzy.search(name, file_type, k)
+                if similarity >= MIN_CANDIDATE_SIMILARITY]
+
+    @staticmethod
+    def open_path(path):
+        if os.path.exists(path):
+            if os.name == 'nt':
+                os.startfile(path)
+            else:
+                subprocess.call(('xdg-open', path))
+            return True
+        return False
+
+    def touch_index(self, *paths):
+        # Our own file operations are pushed to the watcher instead of waiting for it to notice
+        if self.index is not None and self.index.is_built():
+            dirs = [p if os.path.isdir(p) else os.path.dirname(p) for p in paths]
+            if self.watcher is not None:
+                self.watcher.touch(dirs)
+            else:
+                self.index.refresh_dirs(dirs)
+
+    def copy_file(self, source, destination):
+        try:
+            shutil.copy(source, destination)
+            self.touch_index(destination)
+            return True, f"Copied to {destination}"
+        except Exception as e:
+            return False, f"Couldn't copy: {e}"
+
+    def move_file(self, source, destination):
+        try:
+            shutil.move(source, destination)
+            self.touch_index(os.path.dirname(source), destination)
+            return True, f"Moved to {destination}"
+        except Exception as e:
+            return False, f"Couldn't move: {e}"
+
+    def delete_file(self, path, permanent=False):
+        try:
+            if permanent:
+                os.remove(path)
+                self.touch_index(os.path.dirname(path))
+                return True, "Permanently deleted"
+            send2trash.send2trash(path)
+            self.touch_index(os.path.dirname(path))
+            return True, "Sent to Recycle Bin"
+        except Exception as e:
+            return False, f"Deletion failed: {e}"
+
+class DryRunFileManager(FileManager):
+    # Finds files like FileManager but only reports what it would do with them, so scripted
+    # and CI runs exercise the whole command path without opening or touching anything
+    @staticmethod
+    def open_path(path):
+        return os.path.exists(path)
+
+    def copy_file(self, source, destination):
+        return True, f"Would copy {source} to {destination}"
+
+    def move_file(self, source, destination):
+        return True, f"Would move {source} to {destination}"
+
+    def delete_file(self, path, permanent=False):
+        return True, f"Would {'permanently delete' if permanent else 'recycle'} {path}"
+
+class CommandProcessor:
+    def __init__(self, online=ONLINE_LEARNING):
+        # The compact artifact needs only NumPy; the pickle (and sklearn) is the fallback
+        if CompactIntentModel.exists(COMPACT_MODEL_PATH):
+            self.model = CompactIntentModel(COMPACT_MODEL_PATH)
+        else:
+            with open(MODEL_PATH, 'rb') as f:
+                self.model = pickle.load(f)
+        # In online mode an incrementally updated model takes over classification
+        self.online = None
+        if online:
+            self.online = OnlineIntentModel()
+            if not self.online.load():
+                self.online.seed_from_csv(COMMANDS_CSV, preprocess_text)
+        self.extensions = ['mp3', 'mp4', 'pdf', 'docx', 'txt', 'png', 'jpg', 'jpeg','pptx','doc','json','csv','xlsx']
+        self.extractor = EntityExtractor(self.extensions)
+
+    def extract_entities(self, command):
+        # Returns Entities(filename, extension, folder, destination); absent ones are None
+        return self.extractor.extract(command)
+
+    def classify_intent(self, command):
+        return self.classify_batch([command])[0][0]
+
+    def classify_batch(self, commands):
+        # One TF-IDF transform and one predict_proba for the whole batch; returns (intent, probability) pairs
+        probabilities, classes = self._predict_proba(commands)
+        best = probabilities.argmax(axis=1)
+        return [(classes[i], float(probabilities[row, i])) for row, i in enumerate(best)]
+
+    def intents(self):
+        model = self.online if self.online is not None else self.model
+        return list(model.classes_)
+
+    def rank(self, command, k=3):
+        # The k likeliest intents for one command, most probable first
+        probabilities, classes = self._predict_proba([command])
+        return [(classes[i], float(probabilities[0, i])) for i in probabilities[0].argsort()[::-1][:k]]
+
+    def _predict_proba(self, commands):
+        # Commands get the same preprocessing train_model.py applied to the training set
+        model = self.online if self.online is not None else self.model
+        try:
+            return model.predict_proba([preprocess_text(command) for command in commands]), model.classes_
+        except Exception as e:
+            raise RuntimeError(f"Classification error: {str(e)}")
+
+    def learn(self, feedback):
+        # feedback: (feedback_id, command_text, intent) rows; only rows not yet learned cost anything
+        if self.online is None:
+            return 0
+        return self.online.learn([(feedback_id, preprocess_text(text or ''), intent)
+                                  for feedback_id, text, intent in feedback])
+
+
+# ================== Headless Engine ==================
+CommandResult = namedtuple('CommandResult', ['command', 'intent', 'replies'])
+
+class AssistantEngine:
+    # Everything between a command string and its effect on disk: classification, entity
+    # extraction, file lookup and the actions. It needs no display, microphone or speaker.
+    # Front-ends subclass it and override the hooks (on_reply, update_status, ask_choice,
+    # ask_directory); the defaults suit running unattended, where nobody can answer a question.
+    can_ask = False
+
+    def __init__(self, db_url=DB_URL, online=ONLINE_LEARNING, dry_run=False, allow_destructive=True,
+                 index_path=INDEX_PATH):
+        self.db = DatabaseManager(db_url)
+        self.processor = CommandProcessor(online)
+        self.file_index = FileIndex(index_path)
+        self.file_watcher = FileWatcher(self.file_index, roots=FileManager.watch_roots())
+        self.dry_run = dry_run
+        self.file_manager = (DryRunFileManager if dry_run else FileManager)(self.file_index, self.file_watcher)
+        # Unattended front-ends turn off deleting, copying and moving unless asked to; a dry run can't harm anything
+        self.allow_destructive = allow_destructive or dry_run
+        self.media_catalog = MediaCatalog(self.file_index)
+        self.current_user = None
+        self.current_user_id = None
+        self.command_cache = CommandCache()
+        self.last_commands = {}  # user id -> (command, intent) last acted on, for "no, I meant ..."
+        self.learn_lock = threading.Lock()
+        self._context = threading.local()
+        self.setup_user()
+        self.history = HistoryWriter(self.db.engine, CommandHistory.__table__, IntentFeedback.__table__,
+                                     on_feedback=self.on_feedback_written)
+        self.history.start()
+
+    def start(self):
+        # Background work for long-running front-ends; one-shot runs can skip it
+        self.start_file_index()
+        threading.Thread(target=warm_up_preprocessing, daemon=True).start()
+        if self.processor.online is not None:
+            # Catch up on confirmations recorded while online learning was off
+            threading.Thread(target=self.learn_feedback, daemon=True).start()
+
+    def close(self):
+        # Writes out buffered history; call before exiting
+        self.file_watcher.stop()
+        self.history.stop()
+
+    # ---- Hooks for front-ends ----
+    def on_reply(self, text):
+        pass
+
+    def update_status(self, text, status):
+        pass
+
+    def ask_choice(self, question, options):
+        # options: (value, label) pairs; returns the chosen value, or None
+        return None
+
+    def ask_directory(self, title):
+        return None
+
+    def speak(self, text):
+        # Replies are collected for the command being processed on this thread
+        replies = getattr(self._context, 'replies', None)
+        if replies is not None:
+            replies.append(text)
+        self.on_reply(text)
+
+    # ---- State ----
+    def setup_user(self):
+        session = self.db.get_session()
+        self.current_user = session.query(User).first()
+        if not self.current_user:
+            self.current_user = User(username="DefaultUser")
+            session.add(self.current_user)
+            session.commit()
+        self.current_user_id = self.current_user.id
+        session.close()
+
+    def user_id(self, username):
+        # Front-ends serving several people (see assistant_server.py) log commands per user
+        session = self.db.get_session()
+        try:
+            user = session.query(User).filter_by(username=username).first()
+            if user is None:
+                user = User(username=username)
+                session.add(user)
+                session.commit()
+            return user.id
+        except Exception:
+            session.rollback()
+            # Lost a race to create the same user
+            return session.query(User.id).filter_by(username=username).scalar()
+        finally:
+            session.close()
+
+    def update_index(self):
+        # On the first run this walks every search root; later runs only rescan directories
+        # whose mtime changed since the last one
+        if not self.file_index.is_built():
+            self.file_index.rebuild(FileManager.search_roots())
+        else:
+            self.file_index.refresh()
+        self.file_manager.fuzzy.rebuild()
+
+    def start_file_index(self):
+        # Lookups walk the disk until the index is ready; once it is current, the watcher keeps it that way
+        def build():
+            self.update_index()
+            self.file_watcher.start()
+        threading.Thread(target=build, daemon=True).start()
+
+    def log_command(self, command_text, intent, user_id=None, confirmed=False):
+        # Buffered; the history writer commits it with others shortly after
+        self.history.log(command_text, intent, self.current_user_id if user_id is None else user_id, confirmed)
+
+    def on_feedback_written(self):
+        if self.processor.online is not None:
+            threading.Thread(target=self.learn_feedback, daemon=True).start()
+
+    def learn_feedback(self):
+        with self.learn_lock:
+            session = self.db.get_session()
+            try:
+                rows = (session.query(IntentFeedback.id, CommandHistory.command_text, IntentFeedback.intent)
+                        .join(CommandHistory, IntentFeedback.history_id == CommandHistory.id)
+                        .filter(IntentFeedback.id > self.processor.online.last_feedback_id)
+                        .order_by(IntentFeedback.id).all())
+            finally:
+                session.close()
+            if self.processor.learn(rows):
+                # Cached intents may now be out of date
+                self.command_cache.clear()
+
+    # ---- Commands ----
+    def process_command(self, command, prediction=None, cancel=None, user_id=None, allow_destructive=True):
+        # cancel trips when a newer command supersedes this one or it runs past its timeout;
+        # user_id defaults to current_user; allow_destructive=False refuses deleting, copying
+        # and moving for this command alone. Returns CommandResult(command, intent acted on
+        # or None, replies spoken about it).
+        replies = self._context.replies = []
+        self._context.allow_destructive = allow_destructive
+        # Kept for the hooks, so a front-end's dialog can give up once the command is superseded
+        cancel = self._context.cancel = cancel or CancelToken()
+        intent = None
+        try:
+            self.update_status("Analyzing...", "processing")
+            intent = self._process(command, prediction, cancel, user_id)
+        except SearchCancelled:
+            # Superseded while a question was open; the newer command does the talking
+            pass
+        except Exception as e:
+            self.speak(f"Error processing command: {str(e)}")
+        finally:
+            self._context.replies = None
+            self._context.allow_destructive = True
+            self._context.cancel = None
+            self.update_status("Ready", "idle")
+        return CommandResult(command, intent, replies)
+
+    def _process(self, command, prediction, cancel, user_id):
+        correction = CORRECTION.match(command.strip())
+        if correction:
+            return self.correct_last(self.intent_named(correction.group(1)), cancel, user_id)
+        # Repeated commands skip classification and extraction, and usually the search too
+        entry = self.command_cache.lookup(command)
+        clarified = False
+        if entry is None:
+            intent, probability = prediction or self.processor.rank(command, 1)[0]
+            if probability < CLARIFY_CONFIDENCE:
+                # A guess is never acted on: with nobody to ask, the command is skipped
+                if not self.can_ask:
+                    self.speak(f"I'm not sure what you meant by \"{command}\", so I've left it.")
+                    return None
+                intent, clarified = self.clarify_intent(command), True
+                if intent is None:
+                    self.speak("Okay, I'll leave that one.")
+                    return None
+            entry = self.command_cache.store(command, self.analyze_command(command, intent))
+        self.log_command(command, entry.intent, user_id, confirmed=clarified)
+        self.last_commands[self.current_user_id if user_id is None else user_id] = (command, entry.intent)
+        if cancel.cancelled:
+            return None
+        self.perform_action(entry.intent, command, cancel, entry)
+        return entry.intent
+
+    def intent_named(self, phrase):
+        # "move file" names an intent outright; anything else is classified like a command
+        label = '_'.join(phrase.lower().split())
+        if label in self.processor.intents():
+            return label
+        return self.processor.rank(phrase, 1)[0][0]
+
+    def correct_last(self, intent, cancel, user_id=None):
+        # The previous command was confidently misread. The right intent is logged as
+        # confirmed feedback (what online learning trains on), replaces the cached one, and
+        # the command is carried out again as meant.
+        key = self.current_user_id if user_id is None else user_id
+        command, previous = self.last_commands.get(key, (None, None))
+        if command is None:
+            self.speak("There's no earlier command to correct.")
+            return None
+        if intent == previous:
+            self.speak(f"That's what I took \"{command}\" to mean, so I've left it.")
+            return None
+        entry = self.command_cache.store(command, self.analyze_command(command, intent))
+        self.log_command(command, intent, user_id, confirmed=True)
+        self.last_commands[key] = (command, intent)
+        self.speak(f"Sorry about that. Doing \"{command}\" as {intent.replace('_', ' ')} instead.")
+        if cancel.cancelled:
+            return None
+        self.perform_action(intent, command, cancel, entry)
+        return intent
+
+    def clarify_intent(self, command):
+        candidates = self.processor.rank(command)
+        self.speak("I'm not sure what you meant. Which of these was it?")
+        options = [(intent, intent.replace('_', ' ').capitalize()) for intent, probability in candidates]
+        return self.ask_choice(f'"{command}"', options)
+
+    def analyze_command(self, command, intent=None):
+        if intent is None:
+            intent = self.processor.classify_intent(command)
+        return CachedCommand(intent, self.processor.extract_entities(command))
+
+    def resolve(self, entry, name, file_type='file', cancel=None, confirm=False):
+        # confirm: the file is about to be deleted, moved or copied, so a near match is
+        # offered to the user instead of being taken unasked as it is for open and search
+        path = self.command_cache.cached_path(entry, file_type)
+        if path is None:
+            path = self.file_manager.find_file_or_folder(name, file_type, cancel=cancel, fuzzy=not confirm)
+            if confirm and (path is None or os.path.basename(os.path.normpath(path)).lower() != name.lower()):
+                # "zz.txt" is part of test_fuzz.txt, but that doesn't make it the file meant
+                path = self.confirm_near_match(name, file_type, [path] if path else [])
+            if path:
+                self.command_cache.remember_path(entry, path, file_type)
+        return path
+
+    def confirm_near_match(self, name, file_type='file', found=()):
+        # found: paths already turned up that aren't named exactly `name`; offered first
+        candidates = list(found)
+        candidates += [path for path in self.file_manager.find_candidates(name, file_type, k=3) if path not in candidates]
+        candidates = candidates[:3]
+        if not candidates:
+            return None
+        if not self.can_ask:
+            self.speak(f"Nothing is named exactly '{name}', and I won't act on a similar file without asking.")
+            self._context.refused = True
+            return None
+        return self.ask_choice(f"Nothing is named exactly '{name}'. Did you mean one of these?",
+                               [(path, path) for path in candidates])
+
+    def report_missing(self, filename):
+        # confirm_near_match has already said why the similar file it found wasn't used
+        if not getattr(self._context, 'refused', False):
+            self.speak(f"File '{filename}' not found")
+
+    def choose_destination(self, entry, title, cancel=None):
+        # "copy notes.txt to backup" names the folder. Only a system folder or an exact name
+        # in a priority location is taken as-is; a folder the wider search turns up (possibly
+        # a system directory) is confirmed first, and otherwise the user picks one.
+        name = entry.entities.destination
+        if name:
+            path = self.file_manager.find_destination(name)
+            if path:
+                return path
+            if not self.can_ask:
+                self.speak(f"'{name}' isn't one of your usual folders, so I won't guess which one you meant.")
+                return None
+            path = self.file_manager.find_file_or_folder(name, 'folder', cancel=cancel)
+            if path and self.ask_choice(f"Is this the '{name}' folder you meant?", [(path, path)]):
+                return path
+        return self.ask_directory(title)
+
+    def pick_media(self, media_type, fallback_pattern, cancel=None):
+        # The catalog answers once the index is built; until then fall back to a disk search
+        if self.file_index.is_built():
+            return self.media_catalog.pick(media_type, MEDIA_SELECTION)
+        return self.file_manager.find_file_or_folder(fallback_pattern, cancel=cancel)
+
+    def perform_action(self, intent, command, cancel=None, entry=None):
+        self.update_status("Working...", "processing")
+        if entry is None:
+            entry = self.analyze_command(command, intent)
+        filename = entry.entities.filename
+        folder_name = entry.entities.folder
+        self._context.refused = False
+
+        allowed = self.allow_destructive and getattr(self._context, 'allow_destructive', True)
+        if intent in DESTRUCTIVE_INTENTS and not allowed:
+            self.speak("Deleting, copying and moving files is turned off here.")
+            return
+        
+        # Handle filename extraction failure
+        if intent in ['open_file', 'open_media', 'search_file', 'delete_file', 'delete_forever', 'copy_file', 'move_file'] and not filename:
+            self.speak("Could not determine the filename from your command.")
+            return
+        
+        try:
+            if intent in ['open_file', 'open_media']:
+                path = self.resolve(entry, filename, cancel=cancel)
+                if path and self.file_manager.open_path(path):
+                    self.speak(f"Opening {os.path.basename(path)}")
+                else:
+                    self.speak(f"File '{filename}' not found")
+
+            elif intent == 'open_folder':
+                if not folder_name:
+                    folder_name = command.replace("open folder", "").strip()
+                
+                if 'music' in folder_name.lower():
+                    music_path = os.path.join(os.path.expanduser('~'), 'Music')
+                    if os.path.exists(music_path):
+                        self.file_manager.open_path(music_path)
+                        self.speak("Opening your Music folder")
+                        return
+                
+                path = self.resolve(entry, folder_name, 'folder', cancel)
+                if path and self.file_manager.open_path(path):
+                    self.speak(f"Opening folder: {os.path.basename(path)}")
+                else:
+                    self.speak(f"Folder '{folder_name}' not found")
+
+            elif intent == 'play_music':
+                path = self.pick_media('music', '.mp3', cancel)
+                if path and self.file_manager.open_path(path):
+                    if not self.dry_run:
+                        self.media_catalog.mark_played(path)
+                    self.speak(f"Now playing: {os.path.basename(path)}")
+                else:
+                    self.speak("No music files found")
+
+            elif intent == 'play_movie':
+                path = self.pick_media('video', '.mp4', cancel)
+                if path and self.file_manager.open_path(path):
+                    if not self.dry_run:
+                        self.media_catalog.mark_played(path)
+                    self.speak(f"Now playing: {os.path.basename(path)}")
+                else:
+                    self.speak("No video files found")
+
+            elif intent == 'search_file':
+                path = self.resolve(entry, filename, cancel=cancel)
+                if path:
+                    self.speak(f"Found at: {path}")
+                else:
+                    self.speak(f"File '{filename}' not found")
+
+            elif intent == 'delete_file':
+                path = self.resolve(entry, filename, cancel=cancel, confirm=True)
+                if path:
+                    success, message = self.file_manager.delete_file(path)
+                    self.speak(message if success else "Deletion failed")
+                else:
+                    self.report_missing(filename)
+
+            elif intent == 'delete_forever':
+                path = self.resolve(entry, filename, cancel=cancel, confirm=True)
+                if path:
+                    success, message = self.file_manager.delete_file(path, permanent=True)
+                    self.speak(message if success else "Permanent deletion failed")
+                else:
+                    self.report_missing(filename)
+
+            elif intent == 'copy_file':
+                destination = self.choose_destination(entry, "Select destination for copy", cancel)
+                if not destination:
+                    self.speak("No destination folder chosen")
+                elif filename:
+                    path = self.resolve(entry, filename, cancel=cancel, confirm=True)
+                    if path:
+                        success, message = self.file_manager.copy_file(path, destination)
+                        self.speak(message if success else "Copy failed")
+                    else:
+                        self.report_missing(filename)
+
+            elif intent == 'move_file':
+                destination = self.choose_destination(entry, "Select destination for move", cancel)
+                if not destination:
+                    self.speak("No destination folder chosen")
+                elif filename:
+                    path = self.resolve(entry, filename, cancel=cancel, confirm=True)
+                    if path:
+                        success, message = self.file_manager.move_file(path, destination)
+                        self.speak(message if success else "Move failed")
+                    else:
+                        self.report_missing(filename)
+
+            else:
+                self.speak("Command not recognized")
+
+        except SearchTimeout:
+            self.speak("The search took too long, please try a more specific name")
+        except SearchCancelled:
+            # A newer command superseded this one; stay quiet
+            pass
+        except Exception as e:
+            self.speak(f"Operation failed: {str(e)}")
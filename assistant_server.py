@@ -0,0 +1,495 @@
+import io
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import asyncio
+import secrets
+import argparse
+import ipaddress
+import threading
+import http.client
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from asr_backends import create_backend, load_wav
+from assistant_engine import DB_URL, AssistantEngine
+from command_engine import CommandEngine
+
+SERVER_HOST = '127.0.0.1'  # local clients only unless --host says otherwise
+SERVER_PORT = 8765  # HTTP; the WebSocket endpoint listens on the next port up
+DEFAULT_USER = 'DefaultUser'
+SESSION_IDLE = 3600  # seconds before an unused session is forgotten
+MAX_BODY = 16 * 1024 * 1024  # about eight minutes of 16 kHz PCM
+TOKEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server_token')  # created on first serve, mode 0600
+
+
+def decode_audio(data):
+    # WAV files are converted like any other clip; anything else is taken to be raw
+    # mono 16-bit PCM at 16 kHz, which is what a microphone front-end sends anyway
+    if data[:4] == b'RIFF':
+        return load_wav(io.BytesIO(data))
+    return np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    mapped = getattr(address, 'ipv4_mapped', None)
+    return address.is_loopback or (mapped is not None and mapped.is_loopback)
+
+
+def load_token(path=TOKEN_PATH, create=False):
+    # The per-install secret clients send as "Authorization: Bearer <token>". Only the
+    # account that owns the file can read it, which is what makes it worth checking.
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        if not create:
+            return None
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token + '\n')
+    return token
+
+
+class Busy(Exception):
+    pass
+
+
+class Session:
+    # One client; its commands are logged against a row in the users table
+    __slots__ = ('token', 'user_id', 'username', 'last_seen')
+
+    def __init__(self, token, user_id, username):
+        self.token = token
+        self.user_id = user_id
+        self.username = username
+        self.last_seen = time.monotonic()
+
+
+class AssistantServer:
+    # One warm engine shared by every client. The event loop only parses requests and
+    # writes replies; classification, lookups and transcription run on the CommandEngine
+    # pool, whose bounded queue turns overload into a 503 instead of a growing backlog.
+    # token: required on every request (None turns the check off; loopback only).
+    # origins: web pages allowed to call in; requests from any other page are refused.
+    # allow_remote_destructive: let clients on other hosts delete, copy and move files.
+    def __init__(self, engine, asr_backend='whisper-base', workers=4, max_pending=32, token=None, origins=(),
+                 allow_remote_destructive=False):
+        self.engine = engine
+        self.token = token
+        self.origins = set(origins)
+        self.allow_remote_destructive = allow_remote_destructive
+        self.jobs = CommandEngine(workers, max_pending)
+        self.asr = create_backend(asr_backend) if asr_backend else None
+        self.asr_error = None
+        self._asr_ready = False
+        self._asr_lock = threading.Lock()
+        self.sessions = {}
+        self.default_session = None
+        self.stats = {'commands': 0, 'audio': 0, 'rejected': 0, 'refused': 0}
+
+    # ---- Speech ----
+    def load_asr(self):
+        with self._asr_lock:
+            if not self._asr_ready:
+                self.asr.load()
+                self._asr_ready = True
+
+    def _preload_asr(self):
+        try:
+            self.load_asr()
+        except Exception as e:
+            self.asr_error = e
+            print(f"Speech model failed to load: {e}", file=sys.stderr)
+
+    def transcribe(self, audio):
+        if self.asr is None:
+            raise RuntimeError("this server was started without speech recognition")
+        self.load_asr()
+        # One clip at a time: the backends are not thread-safe, and Whisper already uses every core
+        with self._asr_lock:
+            return self.asr.transcribe(audio)
+
+    # ---- Sessions ----
+    async def open_session(self, username=DEFAULT_USER):
+        loop = asyncio.get_running_loop()
+        user_id = await loop.run_in_executor(None, self.engine.user_id, username)
+        session = Session(uuid.uuid4().hex, user_id, username)
+        self.sessions[session.token] = session
+        return session
+
+    def session_for(self, token):
+        # Requests without a session token act as the default user
+        session = self.sessions.get(token) if token else self.default_session
+        if session is not None:
+            session.last_seen = time.monotonic()
+        return session
+
+    def close_session(self, session):
+        self.jobs.cancel(session.token)
+        self.sessions.pop(session.token, None)
+
+    async def expire_sessions(self):
+        while True:
+            await asyncio.sleep(SESSION_IDLE / 10)
+            cutoff = time.monotonic() - SESSION_IDLE
+            for session in [s for s in self.sessions.values() if s.last_seen < cutoff]:
+                self.close_session(session)
+
+    # ---- Work on the pool ----
+    async def run(self, func, *args, session):
+        # Submits to the pool and waits without tying up the event loop. Jobs are grouped
+        # by session, so a disconnecting client cancels only its own work.
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(job):
+            if not future.done():
+                future.set_result(job)
+
+        job = self.jobs.submit(func, *args, group=session.token,
+                               callback=lambda job: loop.call_soon_threadsafe(resolve, job))
+        if job is None:
+            self.stats['rejected'] += 1
+            raise Busy()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            job.cancel()
+            raise
+
+    def _command(self, text, user_id, allow_destructive, cancel):
+        result = self.engine.process_command(text, cancel=cancel, user_id=user_id, allow_destructive=allow_destructive)
+        return {'command': result.command, 'intent': result.intent, 'replies': result.replies}
+
+    def _audio(self, data, user_id, allow_destructive, cancel):
+        text = self.transcribe(decode_audio(data)).strip()
+        if not text:
+            return {'command': '', 'intent': None, 'replies': ["I didn't catch that."]}
+        return self._command(text, user_id, allow_destructive, cancel)
+
+    async def execute(self, kind, payload, session, remote=False):
+        # Returns (HTTP status, reply); WebSocket replies carry the same body. remote: the
+        # client is on another host, so files are only deleted, copied or moved if allowed.
+        started = time.perf_counter()
+        self.stats[kind] += 1
+        func = self._command if kind == 'commands' else self._audio
+        allow_destructive = not remote or self.allow_remote_destructive
+        try:
+            job = await self.run(func, payload, session.user_id, allow_destructive, session=session)
+        except Busy:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': "busy, try again shortly"}
+        if job.state == 'done':
+            reply = dict(job.result, ms=round((time.perf_counter() - started) * 1000, 3))
+            return HTTPStatus.OK, reply
+        if job.state == 'timeout':
+            return HTTPStatus.GATEWAY_TIMEOUT, {'error': "command timed out"}
+        if job.state == 'cancelled':
+            return HTTPStatus.CONFLICT, {'error': "command cancelled"}
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(job.error)}
+
+    # ---- Access ----
+    def authorized(self, authorization):
+        if self.token is None:
+            return True
+        scheme, _, credential = (authorization or '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(credential.strip().encode(), self.token.encode())
+
+    def refuse(self, method, path, headers):
+        # Any web page can reach a local port: it may POST a text/plain "simple request" or
+        # open a WebSocket without asking. So a request needs the install token, must not
+        # come from a page outside the allowlist (non-browser clients send no Origin), and
+        # must declare a content type an HTML form can't send. Returns (status, reply) or None.
+        origin = headers.get('origin')
+        if origin is not None and origin not in self.origins:
+            return HTTPStatus.FORBIDDEN, {'error': "origin not allowed"}
+        if not self.authorized(headers.get('authorization')):
+            return HTTPStatus.UNAUTHORIZED, {'error': "missing or wrong token"}
+        if method == 'POST':
+            content_type = headers.get('content-type', '').partition(';')[0].strip().lower()
+            if path == '/audio':
+                allowed = content_type == 'application/octet-stream' or content_type.startswith('audio/')
+            else:
+                allowed = content_type == 'application/json'
+            if not allowed:
+                return HTTPStatus.UNSUPPORTED_MEDIA_TYPE, {'error': f"unsupported content type {content_type!r}"}
+        return None
+
+    # ---- HTTP ----
+    async def handle_http(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive: JSON in, JSON out
+        peer = writer.get_extra_info('peername')
+        remote = not (peer and is_loopback(peer[0]))
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                # Checked on the headers alone: a refused client doesn't get to send a body
+                refused = self.refuse(method, urlsplit(target).path, headers)
+                if refused is not None:
+                    self.stats['refused'] += 1
+                    await self.respond(writer, *refused, close=True)
+                    break
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "body too large"}, close=True)
+                    break
+                if headers.get('expect', '').lower() == '100-continue':
+                    writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    status, reply = await self.route(method, urlsplit(target).path, headers, body, remote)
+                except (ValueError, KeyError, TypeError) as e:
+                    status, reply = HTTPStatus.BAD_REQUEST, {'error': f"bad request: {e}"}
+                close = headers.get('connection', '').lower() == 'close'
+                await self.respond(writer, status, reply, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, headers, body, remote=False):
+        # Called once refuse() has passed the request
+        session = self.session_for(headers.get('x-session'))
+        if (method, path) == ('GET', '/health'):
+            return HTTPStatus.OK, {'status': 'ok', 'sessions': len(self.sessions),
+                                   'speech': self.asr is not None and self._asr_ready, **self.stats}
+        if (method, path) == ('POST', '/session'):
+            session = await self.open_session(json.loads(body or b'{}').get('user') or DEFAULT_USER)
+            return HTTPStatus.OK, {'session': session.token, 'user': session.username}
+        if session is None:
+            return HTTPStatus.UNAUTHORIZED, {'error': "unknown session"}
+        if (method, path) == ('DELETE', '/session'):
+            if session is not self.default_session:
+                self.close_session(session)
+            return HTTPStatus.OK, {}
+        if (method, path) == ('POST', '/command'):
+            text = json.loads(body)['text'].strip()
+            if not text:
+                raise ValueError("empty command")
+            return await self.execute('commands', text, session, remote)
+        if (method, path) == ('POST', '/audio'):
+            return await self.execute('audio', body, session, remote)
+        return HTTPStatus.NOT_FOUND, {'error': f"no route for {method} {path}"}
+
+    @staticmethod
+    async def respond(writer, status, reply, close=False):
+        body = json.dumps(reply).encode()
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    # ---- WebSocket ----
+    def check_handshake(self, connection, request):
+        # Same checks as HTTP before the upgrade (the server's origins option covers Origin).
+        # Browsers can't set headers on a WebSocket, so the token may also come as ?token=.
+        authorization = request.headers.get('Authorization')
+        token = parse_qs(urlsplit(request.path).query).get('token')
+        if token:
+            authorization = f"Bearer {token[0]}"
+        if not self.authorized(authorization):
+            self.stats['refused'] += 1
+            return connection.respond(HTTPStatus.UNAUTHORIZED, "missing or wrong token\n")
+        return None
+
+    async def handle_websocket(self, websocket):
+        # Text frames are JSON: {"type": "hello", "user": ...} picks the user,
+        # {"type": "command", "text": ..., "id": ...} runs a command and {"type": "cancel"}
+        # stops this client's work. Binary frames are audio. Replies echo the request id,
+        # and several commands may be in flight at once.
+        session = await self.open_session()
+        remote = not is_loopback(websocket.remote_address[0])
+        tasks = set()
+
+        async def answer(kind, payload, request_id):
+            status, reply = await self.execute(kind, payload, session, remote)
+            reply.update(type='result' if status == HTTPStatus.OK else 'error', id=request_id)
+            await websocket.send(json.dumps(reply))
+
+        try:
+            async for message in websocket:
+                session.last_seen = time.monotonic()
+                if isinstance(message, bytes):
+                    task = asyncio.create_task(answer('audio', message, None))
+                else:
+                    try:
+                        request = json.loads(message)
+                        kind = request['type']
+                    except (ValueError, KeyError, TypeError):
+                        await websocket.send(json.dumps({'type': 'error', 'error': "expected a JSON object with a type"}))
+                        continue
+                    if kind == 'hello':
+                        replacement = await self.open_session(request.get('user') or DEFAULT_USER)
+                        self.close_session(session)
+                        session = replacement
+                        await websocket.send(json.dumps({'type': 'session', 'user': session.username}))
+                        continue
+                    if kind == 'cancel':
+                        self.jobs.cancel(session.token)
+                        continue
+                    if kind != 'command' or not str(request.get('text', '')).strip():
+                        await websocket.send(json.dumps({'type': 'error', 'id': request.get('id'),
+                                                         'error': f"can't handle {kind!r}"}))
+                        continue
+                    task = asyncio.create_task(answer('commands', request['text'].strip(), request.get('id')))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.close_session(session)
+
+    # ---- Lifecycle ----
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT):
+        self.default_session = await self.open_session(DEFAULT_USER)
+        if self.asr is not None:
+            # The whole point of a shared process is that the model is warm before the first clip
+            threading.Thread(target=self._preload_asr, daemon=True).start()
+        servers = [await asyncio.start_server(self.handle_http, host, port)]
+        try:
+            from websockets.asyncio.server import serve as serve_websocket
+        except ImportError:
+            print("websockets is not installed; serving HTTP only", file=sys.stderr)
+            print(f"Listening on http://{host}:{port}")
+        else:
+            servers.append(await serve_websocket(self.handle_websocket, host, port + 1, max_size=MAX_BODY,
+                                                 origins=[None, *self.origins], process_request=self.check_handshake))
+            print(f"Listening on http://{host}:{port} and ws://{host}:{port + 1}")
+        expiry = asyncio.create_task(self.expire_sessions())
+        try:
+            await asyncio.gather(*(server.serve_forever() for server in servers))
+        finally:
+            expiry.cancel()
+            for server in servers:
+                server.close()
+            self.jobs.shutdown()
+
+
+# ================== Client ==================
+def send(requests, user=None, host=SERVER_HOST, port=SERVER_PORT, timeout=180, token=None):
+    # Minimal HTTP client for scripts and smoke tests. Text requests are commands and bytes
+    # are audio; all of them share one keep-alive connection and one session.
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def call(method, path, body=None, content_type='application/json'):
+        connection.request(method, path, body, dict(headers, **{'Content-Type': content_type}))
+        return json.loads(connection.getresponse().read())
+
+    try:
+        headers = {'Authorization': f"Bearer {token}"} if token else {}
+        if user:
+            headers['X-Session'] = call('POST', '/session', json.dumps({'user': user}))['session']
+        replies = [call('POST', '/audio', request, 'application/octet-stream') if isinstance(request, bytes)
+                   else call('POST', '/command', json.dumps({'text': request}))
+                   for request in requests]
+        if user:
+            call('DELETE', '/session')
+        return replies
+    finally:
+        connection.close()
+
+
+def send_websocket(commands, user=None, host=SERVER_HOST, port=SERVER_PORT, token=None):
+    # Sends every command at once over one connection and collects the replies in order
+    from websockets.sync.client import connect
+    headers = {'Authorization': f"Bearer {token}"} if token else None
+    with connect(f"ws://{host}:{port + 1}", max_size=MAX_BODY, additional_headers=headers) as websocket:
+        if user:
+            websocket.send(json.dumps({'type': 'hello', 'user': user}))
+            json.loads(websocket.recv())
+        for i, command in enumerate(commands):
+            websocket.send(command if isinstance(command, bytes) else json.dumps({'type': 'command', 'text': command, 'id': i}))
+        replies = [json.loads(websocket.recv()) for _ in commands]
+    return sorted(replies, key=lambda reply: -1 if reply.get('id') is None else reply['id'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one shared assistant to local front-ends")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="run the server")
+    serve.add_argument('--host', default=SERVER_HOST)
+    serve.add_argument('--port', type=int, default=SERVER_PORT)
+    serve.add_argument('--workers', type=int, default=4)
+    serve.add_argument('--max-pending', type=int, default=32)
+    serve.add_argument('--asr', default='whisper-base', help="ASR backend for audio requests, or 'none'")
+    serve.add_argument('--db', default=DB_URL)
+    serve.add_argument('--online', action='store_true', help="classify with the online-learning model")
+    serve.add_argument('--dry-run', action='store_true', help="find files but do not open, copy, move or delete them")
+    serve.add_argument('--allow-destructive', action='store_true',
+                       help="let commands delete, copy and move files (refused otherwise)")
+    serve.add_argument('--allow-remote-destructive', action='store_true',
+                       help="also let clients on other hosts delete, copy and move files")
+    serve.add_argument('--allow-origin', action='append', default=[], metavar='ORIGIN',
+                       help="web page origin (e.g. http://localhost:3000) allowed to call the server")
+    serve.add_argument('--token-file', default=TOKEN_PATH)
+    serve.add_argument('--no-token', action='store_true', help="accept requests without the token (loopback only)")
+
+    client = commands.add_parser('send', help="send commands to a running server")
+    client.add_argument('texts', nargs='*', help="text commands")
+    client.add_argument('--audio', nargs='+', default=[], help="WAV files (or raw 16 kHz PCM) to send as voice commands")
+    client.add_argument('--user')
+    client.add_argument('--host', default=SERVER_HOST)
+    client.add_argument('--port', type=int, default=SERVER_PORT)
+    client.add_argument('--ws', action='store_true', help="send over one WebSocket instead of HTTP requests")
+    client.add_argument('--token-file', default=TOKEN_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        if args.no_token and not is_loopback(args.host):
+            parser.error("--no-token is only allowed when listening on a loopback address")
+        token = None if args.no_token else load_token(args.token_file, create=True)
+        engine = AssistantEngine(db_url=args.db, online=args.online, dry_run=args.dry_run,
+                                 allow_destructive=args.allow_destructive)
+        engine.start()
+        server = AssistantServer(engine, None if args.asr == 'none' else args.asr, args.workers, args.max_pending,
+                                 token, args.allow_origin, args.allow_remote_destructive)
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            engine.close()
+        return 0
+
+    requests = list(args.texts)
+    for path in args.audio:
+        with open(path, 'rb') as f:
+            requests.append(f.read())
+    token = load_token(args.token_file)
+    if args.ws:
+        replies = send_websocket(requests, args.user, args.host, args.port, token)
+    else:
+        replies = send(requests, args.user, args.host, args.port, token=token)
+    for reply in replies:
+        print(json.dumps(reply))
+    return 0 if all('error' not in reply for reply in replies) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
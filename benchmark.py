@@ -0,0 +1,423 @@
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# ================== File Index ==================
+def make_tree(root, files, per_dir=100, fanout=50):
+    dirs = max(1, files // per_dir)
+    created = 0
+    for d in range(dirs):
+        folder = os.path.join(root, f"group_{d % fanout:03d}", f"dir_{d:05d}")
+        os.makedirs(folder, exist_ok=True)
+        for f in range(min(per_dir, files - created)):
+            open(os.path.join(folder, f"file_{d:05d}_{f:03d}.txt"), 'w').close()
+            created += 1
+    return dirs
+
+
+def bench_index(args):
+    from file_index import FileIndex
+
+    workdir = tempfile.mkdtemp(prefix='zuri_bench_')
+    try:
+        tree = os.path.join(workdir, 'tree')
+        print(f"Creating {args.files} files...")
+        dirs, elapsed = timed(make_tree, tree, args.files)
+        print(f"  {dirs} directories in {elapsed:.1f}s")
+
+        index = FileIndex(os.path.join(workdir, 'index.db'))
+        total, full = timed(index.rebuild, [tree])
+        print(f"Full rebuild:        {full:8.2f}s  ({total} entries)")
+
+        rescanned, noop = timed(index.refresh)
+        print(f"Refresh, no changes: {noop:8.2f}s  ({rescanned} directories rescanned)")
+
+        # A handful of edits: new files, a deletion and a new folder
+        for d in range(args.changes):
+            folder = os.path.join(tree, f"group_{d % 50:03d}", f"dir_{d:05d}")
+            open(os.path.join(folder, f"new_{d}.txt"), 'w').close()
+            os.remove(os.path.join(folder, f"file_{d:05d}_000.txt"))
+        os.makedirs(os.path.join(tree, 'group_000', 'fresh'))
+        open(os.path.join(tree, 'group_000', 'fresh', 'needle.txt'), 'w').close()
+
+        rescanned, incremental = timed(index.refresh)
+        print(f"Incremental refresh: {incremental:8.2f}s  ({rescanned} directories rescanned)")
+        print(f"Speed-up vs rebuild: {full / incremental:8.1f}x")
+        assert index.find('needle.txt') is not None
+        assert index.find('file_00000_000.txt') is None
+        assert index.find('new_0.txt') is not None
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ================== Fuzzy Matching ==================
+def bench_fuzzy(args):
+    import random
+    import string
+    from fuzzy_index import TrigramIndex
+
+    random.seed(42)
+    words = [''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(20000)]
+    extensions = ['pdf', 'docx', 'txt', 'mp3', 'mp4', 'jpg', 'png', 'xlsx']
+    workdir = tempfile.mkdtemp(prefix='zuri_bench_')
+    try:
+        targets = ['final_report_draft.docx', 'budget_2024.xlsx', 'holiday_photos_beach.jpg']
+        rows = []
+        for name in targets:
+            path = os.path.join(workdir, name)
+            open(path, 'w').close()
+            rows.append((path, name, 0, 1))
+        for i in range(args.names - len(targets)):
+            name = '_'.join(random.sample(words, random.randint(1, 4))) + '.' + random.choice(extensions)
+            rows.append((f"/home/user/dir_{i % 5000}/{name}", name, 0, i % 7))
+        random.shuffle(rows)
+
+        index, elapsed = timed(TrigramIndex().build, rows)
+        print(f"Built trigram index over {len(index)} names in {elapsed:.1f}s ({len(index.postings)} trigrams)")
+
+        queries = ['final report underscore draft dot docx', 'final raport draft docx',
+                   'budget 2024 dot xlsx', 'holliday photos beach jpg']
+        for query in queries:
+            index.search(query)
+            samples = []
+            for _ in range(args.repeat):
+                results, elapsed = timed(index.search, query)
+                samples.append(elapsed * 1000)
+            samples.sort()
+            best = os.path.basename(results[0][0]) if results else None
+            print(f"  {query!r:45} p50 {samples[len(samples) // 2]:6.2f}ms  "
+                  f"p95 {samples[int(len(samples) * 0.95)]:6.2f}ms  -> {best}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ================== Startup ==================
+EAGER_STARTUP = """
+import time
+start = time.perf_counter()
+from asr_backends import create_backend
+create_backend({backend!r}).load()
+print(time.perf_counter() - start, time.perf_counter() - start)
+"""
+
+LAZY_STARTUP = """
+import time
+start = time.perf_counter()
+from virtual_assistant import SpeechManager
+speech = SpeechManager({backend!r})
+speech.load_model_async()
+constructed = time.perf_counter() - start
+speech.wait_for_model()
+print(constructed, time.perf_counter() - start)
+"""
+
+
+def run_snippet(snippet):
+    # Each run gets a fresh interpreter so import costs are counted every time
+    output = subprocess.run([sys.executable, '-c', snippet], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    blocked, ready = output.stdout.split()[-2:]
+    return float(blocked), float(ready)
+
+
+def bench_startup(args):
+    for label, snippet in (("eager load (old startup)", EAGER_STARTUP), ("background load", LAZY_STARTUP)):
+        runs = sorted(run_snippet(snippet.format(backend=args.backend)) for _ in range(args.runs))
+        blocked, ready = runs[len(runs) // 2]
+        print(f"{label:26} startup blocked {blocked:6.2f}s   voice ready after {ready:6.2f}s")
+
+
+# ================== Speech Recognition ==================
+def normalize_words(text):
+    return re.sub(r"[^\w\s']", ' ', text.lower()).split()
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_asr_backend(name, clips):
+    # Runs in a child process so peak memory belongs to this backend alone
+    import resource
+    from rapidfuzz.distance import Levenshtein
+    from asr_backends import create_backend, load_wav, SAMPLE_RATE
+
+    backend = create_backend(name)
+    _, load_seconds = timed(backend.load)
+    latencies, audio_seconds, errors, reference_words, transcripts = [], 0.0, 0, 0, {}
+    for path, reference in clips:
+        audio = load_wav(path)
+        backend.transcribe(audio[:SAMPLE_RATE])  # warm-up on the first second
+        text, elapsed = timed(backend.transcribe, audio)
+        latencies.append(elapsed)
+        audio_seconds += len(audio) / SAMPLE_RATE
+        transcripts[path] = text
+        if reference is not None:
+            expected = normalize_words(reference)
+            errors += Levenshtein.distance(normalize_words(text), expected)
+            reference_words += len(expected)
+    return {
+        'load': load_seconds,
+        'rtf': sum(latencies) / audio_seconds,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'wer': errors / reference_words if reference_words else None,
+        'transcripts': transcripts,
+    }
+
+
+def bench_asr(args):
+    import multiprocessing
+    from assistant_engine import CommandProcessor
+
+    # Every clip.wav may have a clip.txt next to it holding what was actually said
+    clips = []
+    for name in sorted(os.listdir(args.clips)):
+        if name.lower().endswith('.wav'):
+            path = os.path.join(args.clips, name)
+            reference_path = os.path.splitext(path)[0] + '.txt'
+            reference = open(reference_path).read().strip() if os.path.exists(reference_path) else None
+            clips.append((path, reference))
+    if not clips:
+        raise SystemExit(f"No .wav files in {args.clips}")
+
+    processor = CommandProcessor()
+    context = multiprocessing.get_context('spawn')
+    print(f"{'backend':14} {'load':>7} {'RTF':>6} {'p50':>7} {'p95':>7} {'peak MB':>8} {'WER':>6} {'intents':>8}")
+    for name in args.backends:
+        with context.Pool(1) as pool:
+            try:
+                stats = pool.apply(run_asr_backend, (name, clips))
+            except Exception as e:
+                print(f"{name:14} failed: {e}")
+                continue
+        # An intent counts as right when the transcript classifies like the reference does
+        judged = [(processor.classify_intent(stats['transcripts'][path]), processor.classify_intent(reference))
+                  for path, reference in clips if reference is not None]
+        intents = f"{sum(a == b for a, b in judged)}/{len(judged)}" if judged else '-'
+        wer = f"{stats['wer']:.1%}" if stats['wer'] is not None else '-'
+        print(f"{name:14} {stats['load']:6.2f}s {stats['rtf']:6.3f} {stats['p50']:6.3f}s {stats['p95']:6.3f}s "
+              f"{stats['peak_mb']:8.0f} {wer:>6} {intents:>8}")
+
+
+# ================== Intent Classification ==================
+def bench_classify(args):
+    import pandas as pd
+    from assistant_engine import CommandProcessor
+
+    processor = CommandProcessor()
+    commands = pd.read_csv(args.dataset)['Command'].tolist()
+    commands = (commands * (args.commands // len(commands) + 1))[:args.commands]
+
+    _, single = timed(lambda: [processor.classify_intent(command) for command in commands])
+    print(f"classify_intent, one by one: {len(commands) / single:10.0f} commands/s")
+    for size in args.batch_sizes:
+        _, batched = timed(lambda: [processor.classify_batch(commands[i:i + size])
+                                    for i in range(0, len(commands), size)])
+        print(f"classify_batch, batches of {size:<5}: {len(commands) / batched:8.0f} commands/s")
+
+
+def bench_entities(args):
+    import csv
+    from assistant_engine import CommandProcessor
+
+    processor = CommandProcessor()
+    with open(args.corpus, newline='') as f:
+        commands = [row['Command'] for row in csv.DictReader(f)]
+    runs = max(1, args.commands // len(commands))
+    _, elapsed = timed(lambda: [processor.extract_entities(command) for _ in range(runs) for command in commands])
+    print(f"extract_entities: {elapsed / (runs * len(commands)) * 1e6:.1f} us/command "
+          f"over {runs * len(commands)} commands")
+
+
+def bench_preprocess(args):
+    import pandas as pd
+    from preprocessing import preprocess_text, warm_up
+
+    commands = pd.read_csv(args.dataset)['Command'].dropna().tolist()
+    _, load = timed(warm_up)
+    print(f"lemmatizer load: {load * 1000:.0f} ms (background thread at startup)")
+    _, cold = timed(lambda: [preprocess_text(command) for command in commands])
+    print(f"first pass, lemma cache cold: {cold / len(commands) * 1e6:6.1f} us/command")
+    runs = max(1, args.commands // len(commands))
+    _, warm = timed(lambda: [preprocess_text(command) for _ in range(runs) for command in commands])
+    print(f"lemma cache warm:             {warm / (runs * len(commands)) * 1e6:6.1f} us/command (budget 50 us)")
+
+
+def bench_ui(args):
+    import threading
+    from ui_dispatch import UIDispatcher, UI_TICK_MS, UI_BUDGET_MS
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        label = tk.Label(root)
+        label.pack()
+
+        def apply(text):
+            label.config(text=text)
+
+        def repaint():
+            root.update_idletasks()
+    except Exception:
+        # No display: stand in for a widget update with a fixed busy-wait
+        root = None
+
+        def apply(text):
+            end = time.perf_counter() + args.repaint_us / 1e6
+            while time.perf_counter() < end:
+                pass
+
+        def repaint():
+            pass
+
+    print(f"{args.commands} commands from {args.workers} workers, "
+          f"{'Tk widgets' if root else f'simulated {args.repaint_us} us widget updates (no display)'}")
+    for mode in ('every event', 'coalesced'):
+        # 'every event' is the old behaviour: nothing merged, the whole backlog applied at once
+        dispatcher = UIDispatcher(after=None, budget_ms=1e9 if mode == 'every event' else UI_BUDGET_MS)
+        post_status = ((lambda text: dispatcher.post(apply, text)) if mode == 'every event'
+                       else (lambda text: dispatcher.post_latest('status', apply, text)))
+
+        def worker(count):
+            for i in range(count):
+                post_status("Analyzing...")
+                post_status("Working...")
+                dispatcher.post(apply, f"reply {i}")
+                post_status("Ready")
+
+        threads = [threading.Thread(target=worker, args=(args.commands // args.workers,))
+                   for _ in range(args.workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        ticks = []
+        while any(thread.is_alive() for thread in threads) or dispatcher.pending():
+            tick_started = time.perf_counter()
+            dispatcher.drain()
+            repaint()
+            ticks.append((time.perf_counter() - tick_started) * 1000)
+            time.sleep(UI_TICK_MS / 1000)
+        total = time.perf_counter() - started
+        print(f"  {mode:12} longest stall {max(ticks):7.1f} ms, p95 tick {percentile(ticks, 0.95):6.2f} ms, "
+              f"{dispatcher.stats['events']:5} widget updates, drained in {total:.2f} s")
+    if root is not None:
+        root.destroy()
+
+
+# ================== Command History ==================
+def bench_history(args):
+    import tempfile
+    from assistant_engine import DatabaseManager, CommandHistory, IntentFeedback
+    from history_writer import HistoryWriter
+
+    workdir = tempfile.mkdtemp(prefix='zuri_history_')
+    try:
+        # The old path: one session and one commit per command
+        db = DatabaseManager(f"sqlite:///{os.path.join(workdir, 'sync.db')}")
+        latencies = []
+        started = time.perf_counter()
+        for i in range(args.commands):
+            call_started = time.perf_counter()
+            session = db.get_session()
+            session.add(CommandHistory(command_text=f"open report_{i}.pdf", intent='open_file', user_id=1))
+            session.commit()
+            session.close()
+            latencies.append((time.perf_counter() - call_started) * 1000)
+        total = time.perf_counter() - started
+        print(f"commit per command: {args.commands / total:9.0f} rows/s, "
+              f"p50 {percentile(latencies, 0.5):7.3f} ms, p95 {percentile(latencies, 0.95):7.3f} ms on the command path")
+
+        db = DatabaseManager(f"sqlite:///{os.path.join(workdir, 'batched.db')}")
+        writer = HistoryWriter(db.engine, CommandHistory.__table__, IntentFeedback.__table__, batch_size=args.batch)
+        writer.start()
+        latencies = []
+        started = time.perf_counter()
+        for i in range(args.commands):
+            call_started = time.perf_counter()
+            writer.log(f"open report_{i}.pdf", 'open_file', 1)
+            latencies.append((time.perf_counter() - call_started) * 1000)
+        writer.flush()
+        total = time.perf_counter() - started
+        writer.stop()
+        print(f"batched writer:     {args.commands / total:9.0f} rows/s, "
+              f"p50 {percentile(latencies, 0.5):7.3f} ms, p95 {percentile(latencies, 0.95):7.3f} ms on the command path "
+              f"({writer.stats['batches']} transactions, largest {writer.stats['largest_batch']} rows)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    from asr_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Zuri performance benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index = commands.add_parser('index', help="full rebuild vs incremental refresh of the filename index")
+    index.add_argument('--files', type=int, default=500000)
+    index.add_argument('--changes', type=int, default=10)
+    index.set_defaults(func=bench_index)
+
+    fuzzy = commands.add_parser('fuzzy', help="ranked trigram filename lookups")
+    fuzzy.add_argument('--names', type=int, default=1000000)
+    fuzzy.add_argument('--repeat', type=int, default=50)
+    fuzzy.set_defaults(func=bench_fuzzy)
+
+    startup = commands.add_parser('startup', help="time the speech model blocks startup, eager vs background")
+    startup.add_argument('--backend', default='whisper-base')
+    startup.add_argument('--runs', type=int, default=3)
+    startup.set_defaults(func=bench_startup)
+
+    asr = commands.add_parser('asr', help="latency/accuracy of each ASR backend over recorded command WAVs")
+    asr.add_argument('clips', help="directory of 16-bit WAV clips, each optionally with a .txt transcript")
+    asr.add_argument('--backends', nargs='+', default=list(BACKENDS),
+                     help="e.g. whisper-base whisper-base-int8 to compare fp32 with the CPU-optimized path")
+    asr.set_defaults(func=bench_asr)
+
+    classify = commands.add_parser('classify', help="intent classification throughput, single vs batched")
+    classify.add_argument('--dataset', default='commands.csv')
+    classify.add_argument('--commands', type=int, default=5000)
+    classify.add_argument('--batch-sizes', type=int, nargs='+', default=[32, 256, 5000])
+    classify.set_defaults(func=bench_classify)
+
+    entities = commands.add_parser('entities', help="per-command cost of filename/folder/destination extraction")
+    entities.add_argument('--corpus', default='entity_corpus.csv')
+    entities.add_argument('--commands', type=int, default=100000)
+    entities.set_defaults(func=bench_entities)
+
+    preprocess = commands.add_parser('preprocess', help="per-command cost of the shared tokenizer/lemmatizer")
+    preprocess.add_argument('--dataset', default='commands.csv')
+    preprocess.add_argument('--commands', type=int, default=100000)
+    preprocess.set_defaults(func=bench_preprocess)
+
+    ui = commands.add_parser('ui', help="Tk main-loop stall under a burst of commands posting status updates")
+    ui.add_argument('--commands', type=int, default=1000)
+    ui.add_argument('--workers', type=int, default=2)
+    ui.add_argument('--repaint-us', type=int, default=200, help="simulated widget update cost without a display")
+    ui.set_defaults(func=bench_ui)
+
+    history = commands.add_parser('history', help="command history insert throughput, commit per command vs batched")
+    history.add_argument('--commands', type=int, default=5000)
+    history.add_argument('--batch', type=int, default=256, help="rows per transaction for the batched writer")
+    history.set_defaults(func=bench_history)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
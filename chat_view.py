@@ -0,0 +1,124 @@
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+CHAT_BG = "#e5e5ea"
+ROW_BG = "#f0f4f8"
+BUBBLE_BG = {"user": "#dcf8c6", "assistant": "#ffffff"}
+WRAP_LENGTH = 450
+ROW_PADY = 5
+ROW_PADX = 10
+AVATAR_PADY = 10
+
+
+class _Row:
+    # One reusable bubble: a full-width row frame holding the avatar and message labels
+    def __init__(self, canvas, font, scroll_tag):
+        self.frame = tk.Frame(canvas, bg=ROW_BG, pady=ROW_PADY)
+        self.bubble = tk.Frame(self.frame)
+        self.avatar = tk.Label(self.bubble, text="🤖", font=("Segoe UI", 14), bg=BUBBLE_BG["assistant"])
+        self.label = tk.Label(self.bubble, font=font, fg="#333333", wraplength=WRAP_LENGTH,
+                              justify=tk.LEFT, padx=10, pady=10)
+        # The rows cover the canvas, so the wheel has to scroll from them as well
+        for widget in (self.frame, self.bubble, self.avatar, self.label):
+            widget.bindtags(widget.bindtags() + (scroll_tag,))
+        self.window = canvas.create_window(ROW_PADX, 0, window=self.frame, anchor='nw', state='hidden')
+        self.index = None
+        self.sender = None
+
+    def bind(self, index, text, sender):
+        self.index = index
+        self.label.config(text=text)
+        if sender == self.sender:
+            return
+        self.sender = sender
+        bg = BUBBLE_BG.get(sender, BUBBLE_BG["assistant"])
+        self.bubble.config(bg=bg)
+        self.label.config(bg=bg)
+        self.bubble.pack_forget()
+        self.avatar.pack_forget()
+        self.label.pack_forget()
+        if sender == "user":
+            self.bubble.pack(side=tk.RIGHT, anchor=tk.E, padx=(50, 0))
+            self.label.pack(side=tk.RIGHT)
+        else:
+            self.bubble.pack(side=tk.LEFT, anchor=tk.W, padx=(0, 50))
+            self.avatar.pack(side=tk.LEFT, padx=(10, 5), pady=AVATAR_PADY)
+            self.label.pack(side=tk.LEFT)
+
+
+class ChatTranscript:
+    # Messages live in a plain list with their row heights and running bottom offsets; only
+    # the rows intersecting the viewport exist as widgets, drawn from a pool that never
+    # grows beyond one screenful. Appending measures one message; scrolling rebinds the
+    # pool after a bisect into the offsets, so neither depends on the history length.
+    def __init__(self, parent, font):
+        self.font = font
+        self.messages = []
+        self.bottoms = []
+        self.canvas = tk.Canvas(parent, bg=CHAT_BG, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set, scrollregion=(0, 0, 0, 0))
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        # Wheel bindings live on a bindtag shared by the canvas and every row widget
+        self.scroll_tag = f'ChatScroll{id(self)}'
+        self.canvas.bind_class(self.scroll_tag, "<MouseWheel>", self._on_wheel)
+        self.canvas.bind_class(self.scroll_tag, "<Button-4>", lambda event: self.yview('scroll', -1, 'units'))
+        self.canvas.bind_class(self.scroll_tag, "<Button-5>", lambda event: self.yview('scroll', 1, 'units'))
+        self.canvas.bindtags(self.canvas.bindtags() + (self.scroll_tag,))
+        self.pool = []
+
+        # Never shown; asking it for its requested height sizes a message without a real row
+        self._measure = tk.Label(parent, font=font, wraplength=WRAP_LENGTH, justify=tk.LEFT, padx=10, pady=10)
+        avatar = tk.Label(parent, text="🤖", font=("Segoe UI", 14))
+        self._avatar_height = avatar.winfo_reqheight() + 2 * AVATAR_PADY
+        avatar.destroy()
+
+    def __len__(self):
+        return len(self.messages)
+
+    def append(self, text, sender="user"):
+        at_bottom = not self.messages or self.canvas.yview()[1] >= 0.999
+        self._measure.config(text=text)
+        height = self._measure.winfo_reqheight()
+        if sender != "user":
+            height = max(height, self._avatar_height)
+        height += 2 * ROW_PADY
+        self.messages.append((text, sender))
+        self.bottoms.append((self.bottoms[-1] if self.bottoms else 0) + height)
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self.bottoms[-1]))
+        if at_bottom:
+            self.canvas.yview_moveto(1.0)
+        self.render()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+
+    def _on_wheel(self, event):
+        self.yview('scroll', -1 if event.delta > 0 else 1, 'units')
+
+    def render(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        width = max(1, self.canvas.winfo_width() - 2 * ROW_PADX)
+        first = bisect.bisect_right(self.bottoms, top)
+        slot = 0
+        for index in range(first, len(self.messages)):
+            row_top = self.bottoms[index - 1] if index else 0
+            if row_top > bottom:
+                break
+            if slot == len(self.pool):
+                self.pool.append(_Row(self.canvas, self.font, self.scroll_tag))
+            row = self.pool[slot]
+            if row.index != index:
+                row.bind(index, *self.messages[index])
+            self.canvas.coords(row.window, ROW_PADX, row_top)
+            self.canvas.itemconfigure(row.window, width=width, state='normal')
+            slot += 1
+        for row in self.pool[slot:]:
+            if row.index is not None:
+                row.index = None
+                self.canvas.itemconfigure(row.window, state='hidden')
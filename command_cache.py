@@ -0,0 +1,86 @@
+import os
+import stat
+import threading
+from collections import OrderedDict
+
+
+def normalize_command(command):
+    # "Open  folder Downloads?" and "open folder downloads" are the same request
+    return ' '.join(command.lower().split()).rstrip('?!.,')
+
+
+class CachedCommand:
+    __slots__ = ('intent', 'entities', 'path', 'file_type')
+
+    def __init__(self, intent, entities):
+        self.intent = intent
+        self.entities = entities
+        self.path = None
+        self.file_type = None
+
+
+class CommandCache:
+    # Bounded LRU of classified commands and the path each one last resolved to. A cached
+    # path is only trusted after an os.stat shows it still exists with the right type.
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.path_hits = 0
+        self.path_misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, command):
+        key = normalize_command(command)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def store(self, command, entry):
+        key = normalize_command(command)
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return entry
+
+    def cached_path(self, entry, file_type='file'):
+        path = entry.path
+        if path is not None and entry.file_type == file_type:
+            try:
+                is_dir = stat.S_ISDIR(os.stat(path).st_mode)
+            except OSError:
+                is_dir = None
+            if is_dir is not None and is_dir == (file_type == 'folder'):
+                with self._lock:
+                    self.path_hits += 1
+                return path
+            entry.path = None
+        with self._lock:
+            self.path_misses += 1
+        return None
+
+    def remember_path(self, entry, path, file_type='file'):
+        entry.path = path
+        entry.file_type = file_type
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'path_hits': self.path_hits,
+                'path_misses': self.path_misses,
+            }
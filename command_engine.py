@@ -0,0 +1,130 @@
+import sys
+import time
+import queue
+import threading
+
+from file_search import CancelToken
+
+COMMAND_TIMEOUT = 120  # seconds before a running command is cancelled
+
+
+class Job:
+    # One submitted command. Cancellation is cooperative: the function receives the job's
+    # CancelToken as cancel=..., and the searches it starts stop when it trips.
+    def __init__(self, func, args, kwargs, group=None, timeout=None, callback=None):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.group = group
+        self.timeout = timeout
+        self.callback = callback
+        self.token = CancelToken()
+        self.state = 'pending'  # -> running -> done / failed / cancelled / timeout
+        self.result = None
+        self.error = None
+        self.timed_out = False
+        self.seconds = None
+        self.finished = threading.Event()
+
+    def cancel(self):
+        self.token.cancel()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def _expire(self):
+        if self.state == 'running':
+            self.timed_out = True
+            self.token.cancel()
+
+
+class CommandEngine:
+    # Fixed pool of workers fed from a bounded queue. A full queue rejects new work instead
+    # of piling up threads, and finished jobs wait in a results queue for the owner (the
+    # Tk thread, via root.after) to collect with poll().
+    def __init__(self, workers=2, max_pending=8, timeout=COMMAND_TIMEOUT):
+        self.timeout = timeout
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.results = queue.Queue()
+        self.active = set()
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, func, *args, group=None, supersede=False, timeout=None, callback=None, **kwargs):
+        # supersede=True cancels the group's earlier jobs, queued or running, so the newest
+        # command wins. A job with a callback hands itself to that (on the worker thread)
+        # instead of the results queue. Returns None when the queue is full.
+        job = Job(func, args, kwargs, group, timeout if timeout is not None else self.timeout, callback)
+        with self._lock:
+            if supersede:
+                for other in self.active:
+                    if other.group == group:
+                        other.cancel()
+            try:
+                self.pending.put_nowait(job)
+            except queue.Full:
+                return None
+            self.active.add(job)
+        return job
+
+    def cancel(self, group=None):
+        with self._lock:
+            for job in self.active:
+                if group is None or job.group == group:
+                    job.cancel()
+
+    def poll(self, handle, limit=100):
+        # Call from the owning thread; hands over up to `limit` finished jobs
+        for _ in range(limit):
+            try:
+                job = self.results.get_nowait()
+            except queue.Empty:
+                return
+            handle(job)
+
+    def shutdown(self):
+        self.cancel()
+        for _ in self._threads:
+            self.pending.put(None)
+
+    def _work(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            if job.cancelled:
+                job.state = 'cancelled'
+            else:
+                self._run(job)
+            with self._lock:
+                self.active.discard(job)
+            job.finished.set()
+            if job.callback is not None:
+                try:
+                    job.callback(job)
+                except Exception as e:
+                    print(f"Job callback failed: {e}", file=sys.stderr)
+            else:
+                self.results.put(job)
+
+    def _run(self, job):
+        job.state = 'running'
+        timer = None
+        if job.timeout:
+            timer = threading.Timer(job.timeout, job._expire)
+            timer.daemon = True
+            timer.start()
+        started = time.monotonic()
+        try:
+            job.result = job.func(*job.args, cancel=job.token, **job.kwargs)
+            job.state = 'timeout' if job.timed_out else 'cancelled' if job.cancelled else 'done'
+        except Exception as e:
+            job.error = e
+            job.state = 'timeout' if job.timed_out else 'cancelled' if job.cancelled else 'failed'
+        finally:
+            if timer is not None:
+                timer.cancel()
+        job.seconds = time.monotonic() - started
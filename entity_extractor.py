@@ -0,0 +1,108 @@
+import re
+from collections import namedtuple
+
+from fuzzy_index import normalize_spoken
+
+Entities = namedtuple('Entities', 'filename extension folder destination')
+
+# Command verbs, articles and prepositions. A spoken filename is the word carrying the
+# extension plus any words directly before it, up to the first of these.
+GRAMMAR = frozenset("""
+    a an the my me our your this that these those some any all it
+    please up named called with of in on from to into for and at by
+""".split())
+VERBS = frozenset("""
+    open launch start load show display access view bring run play stream watch listen hear
+    delete erase remove trash permanently forever search find look locate scan
+    copy duplicate clone backup replicate save make move relocate transfer send shift
+    close stop go navigate get fetch return
+""".split())
+# Media nouns are filler before a filename but are real folder names ("Music folder")
+MEDIA_NOUNS = frozenset("""
+    document movie film song track video clip audio music image photo picture spreadsheet presentation
+""".split())
+FOLDER_FILLER = GRAMMAR | VERBS | frozenset(('file', 'files', 'folder', 'folders', 'directory'))
+FILLER = FOLDER_FILLER | MEDIA_NOUNS
+# "I want to watch something" is a wish, not a destination
+ACTIVITY_VERBS = frozenset('watch listen hear see read play do'.split())
+FOLDER_WORDS = frozenset(('folder', 'directory'))
+DESTINATION_WORDS = frozenset(('to', 'into'))
+FOLDER_STOP_WORDS = frozenset(('please',))
+# "to another folder" names no place; the caller has to ask
+GENERIC_PLACES = frozenset("""
+    a an the my another other different new some location place folder directory somewhere
+""".split())
+
+TOKEN = re.compile(r"[^\s'\"?!,;]+")
+
+
+class EntityExtractor:
+    # Everything is compiled once; extract() tokenizes a command a single time and reads
+    # every entity from those tokens, so words are only ever stripped whole.
+    def __init__(self, extensions):
+        self.extensions = frozenset(ext.lower() for ext in extensions)
+        self.file_token = re.compile(r'(.+)\.(' + '|'.join(map(re.escape, self.extensions)) + r')')
+
+    def extract(self, command):
+        # normalize_spoken also lower-cases, matching the index's lower-cased names. Whisper
+        # ends sentences with '.', which would otherwise hide "notes.txt." from file_token.
+        tokens = [token for token in (token.rstrip('.:') for token in TOKEN.findall(normalize_spoken(command)))
+                  if token]
+
+        filename = extension = None
+        file_at = -1
+        for i, token in enumerate(tokens):
+            match = self.file_token.fullmatch(token)
+            if match:
+                start = i
+                while start > 0 and tokens[start - 1] not in FILLER:
+                    start -= 1
+                filename = ' '.join(tokens[start:i + 1])
+                extension = match.group(2)
+                file_at = i
+                break
+        if extension is None:
+            # "search my pc for pdfs" still names a file type
+            for word in tokens:
+                if word in self.extensions or (word[-1:] == 's' and word[:-1] in self.extensions):
+                    extension = word if word in self.extensions else word[:-1]
+                    break
+
+        return Entities(filename, extension, self._folder(tokens), self._destination(tokens, file_at))
+
+    @staticmethod
+    def _folder(tokens):
+        for i, word in enumerate(tokens):
+            if word not in FOLDER_WORDS:
+                continue
+            # "open folder projects please"
+            if i > 0 and tokens[i - 1] == 'open' and i + 1 < len(tokens):
+                words = []
+                for following in tokens[i + 1:]:
+                    if following in FOLDER_STOP_WORDS:
+                        break
+                    words.append(following)
+                return ' '.join(words) or None
+            # "go to the pictures folder", "access my downloads directory"
+            start = i
+            while start > 0 and tokens[start - 1] not in FOLDER_FILLER:
+                start -= 1
+            if start < i and not all(word in GENERIC_PLACES for word in tokens[start:i]):
+                return ' '.join(tokens[start:i])
+        return None
+
+    @staticmethod
+    def _destination(tokens, file_at):
+        for i in range(len(tokens) - 1, file_at, -1):
+            if tokens[i] in DESTINATION_WORDS:
+                words = tokens[i + 1:]
+                if words and words[0] in ACTIVITY_VERBS:
+                    return None
+                while words and words[0] in ('the', 'my', 'a', 'an'):
+                    words = words[1:]
+                if words and words[-1] in FOLDER_WORDS:
+                    words = words[:-1]
+                if not words or all(word in GENERIC_PLACES for word in words):
+                    return None
+                return ' '.join(words)
+        return None
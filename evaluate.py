@@ -0,0 +1,96 @@
+import csv
+import argparse
+from collections import Counter
+
+import pandas as pd
+
+from assistant_engine import DB_URL, CommandProcessor, DatabaseManager, CommandHistory
+
+BATCH_SIZE = 1000
+LOW_CONFIDENCE = 0.5
+
+
+def evaluate_dataset(processor, path):
+    df = pd.read_csv(path)
+    results = processor.classify_batch(df['Command'])
+    df['Predicted'] = [intent for intent, probability in results]
+    df['Probability'] = [probability for intent, probability in results]
+
+    correct = df['Predicted'] == df['Intent']
+    print(f"Accuracy on {path}: {correct.mean():.1%} ({correct.sum()}/{len(df)})")
+    print("Per-intent accuracy:")
+    for intent, group in df.groupby('Intent'):
+        print(f"  {intent:16} {(group['Predicted'] == intent).mean():6.1%}")
+    uncertain = df[df['Probability'] < LOW_CONFIDENCE]
+    print(f"Predictions below {LOW_CONFIDENCE:.0%} confidence: {len(uncertain)}")
+    for _, row in df[~correct].iterrows():
+        print(f"  {row['Command']!r}: expected {row['Intent']}, got {row['Predicted']} ({row['Probability']:.2f})")
+
+
+def replay_history(processor, db_url):
+    # Re-classify every logged command with the current model and show where it now disagrees
+    session = DatabaseManager(db_url).get_session()
+    transitions = Counter()
+    total = 0
+    try:
+        query = (session.query(CommandHistory.command_text, CommandHistory.intent)
+                 .order_by(CommandHistory.id).yield_per(BATCH_SIZE))
+        batch = []
+        for row in query:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                total += replay_batch(processor, batch, transitions)
+                batch = []
+        if batch:
+            total += replay_batch(processor, batch, transitions)
+    finally:
+        session.close()
+
+    changed = sum(count for (old, new), count in transitions.items() if old != new)
+    print(f"Replayed {total} commands; {changed} would now get a different intent")
+    for (old, new), count in transitions.most_common():
+        if old != new:
+            print(f"  {old} -> {new}: {count}")
+
+
+def replay_batch(processor, batch, transitions):
+    results = processor.classify_batch([text or '' for text, intent in batch])
+    for (text, old), (new, probability) in zip(batch, results):
+        transitions[(old, new)] += 1
+    return len(batch)
+
+
+def check_entities(processor, path):
+    # Regression corpus: every command with the entities it must extract (blank = none)
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    failures = 0
+    for row in rows:
+        expected = tuple(row[field] or None for field in ('Filename', 'Extension', 'Folder', 'Destination'))
+        actual = tuple(processor.extract_entities(row['Command']))
+        if actual != expected:
+            failures += 1
+            print(f"  {row['Command']!r}: expected {expected}, got {actual}")
+    print(f"Entity extraction: {len(rows) - failures}/{len(rows)} commands match {path}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline evaluation of the intent classifier")
+    parser.add_argument('--dataset', default='commands.csv', help="labelled CSV with Command,Intent columns")
+    parser.add_argument('--history', action='store_true', help="replay the command_history table instead")
+    parser.add_argument('--db', default=DB_URL)
+    parser.add_argument('--entities', metavar='CORPUS', help="check entity extraction against a corpus CSV")
+    args = parser.parse_args()
+
+    processor = CommandProcessor()
+    if args.entities:
+        return 1 if check_entities(processor, args.entities) else 0
+    if args.history:
+        replay_history(processor, args.db)
+    else:
+        evaluate_dataset(processor, args.dataset)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,374 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'file_index.db')
+SCHEMA_VERSION = '4'
+
+# Pseudo filesystems that a full-disk scan would otherwise crawl forever on Linux
+EXCLUDED_DIRS = set() if os.name == 'nt' else {'/proc', '/sys', '/dev', '/run'}
+
+BATCH_SIZE = 10000
+REFRESH_CHUNK = 200  # changed directories rescanned per write-lock hold
+
+# Extensions the media catalog serves; only these files pay for a stat() during a scan
+MEDIA_TYPES = {
+    'music': ('mp3', 'wav', 'flac', 'm4a', 'ogg', 'aac', 'wma'),
+    'video': ('mp4', 'mkv', 'avi', 'mov', 'wmv', 'webm'),
+}
+MEDIA_EXTENSIONS = {ext for extensions in MEDIA_TYPES.values() for ext in extensions}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    mtime INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_entries_parent ON entries (parent);
+CREATE INDEX IF NOT EXISTS idx_entries_ext ON entries (ext, is_dir);
+CREATE INDEX IF NOT EXISTS idx_entries_name ON entries (is_dir, name);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    depth INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plays (
+    path TEXT PRIMARY KEY,
+    played_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Trigram full-text index over entries.name, so a substring lookup reads only the rows
+# that contain the needle's trigrams instead of the whole table. Needs SQLite's FTS5.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    name, content='entries', content_rowid='rowid', tokenize='trigram'
+);
+"""
+# Keep it in step with entries row by row; a full rebuild drops them and reindexes in one pass
+FTS_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+        INSERT INTO entries_fts (rowid, name) VALUES (new.rowid, new.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+        INSERT INTO entries_fts (entries_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+    END""",
+)
+
+
+def subtree_bounds(path):
+    # Every path strictly below `path` sorts inside [prefix, upper)
+    prefix = path if path.endswith(os.sep) else path + os.sep
+    upper = prefix[:-1] + chr(ord(os.sep) + 1)
+    return prefix, upper
+
+
+class FileIndex:
+    def __init__(self, db_path=INDEX_PATH):
+        self.db_path = db_path
+        # Bumped on every change so in-memory views of the index know when to reload
+        self.generation = 0
+        self._write_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);")
+            # The index is only a cache, so an old layout is simply dropped and rebuilt
+            if self._get_meta(conn, 'schema_version') != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS entries_fts; DROP TABLE IF EXISTS entries; "
+                                   "DROP TABLE IF EXISTS dirs; DELETE FROM meta;")
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+                for statement in FTS_TRIGGERS:
+                    conn.execute(statement)
+                self.trigram = True
+            except sqlite3.OperationalError:
+                # No FTS5 (or no trigram tokenizer) in this SQLite build: substring lookups scan
+                self.trigram = False
+            self._set_meta(conn, 'schema_version', SCHEMA_VERSION)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _get_meta(self, conn, key):
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def is_built(self):
+        with self._connection() as conn:
+            return self._get_meta(conn, 'built_at') is not None
+
+    def roots(self):
+        with self._connection() as conn:
+            value = self._get_meta(conn, 'roots')
+        return json.loads(value) if value else []
+
+    def priority_ranks(self):
+        # Ranks of the user's own roots; filesystem and drive roots ('/', 'D:\\') are the wide net
+        return {rank for rank, root in enumerate(self.roots()) if os.path.dirname(root) != root}
+
+    def count(self):
+        with self._connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def entries(self):
+        with self._connection() as conn:
+            yield from conn.execute('SELECT path, name, is_dir, rank FROM entries')
+
+    def media_entries(self, extensions):
+        marks = ', '.join('?' * len(extensions))
+        with self._connection() as conn:
+            return conn.execute(
+                f'SELECT path, ext, mtime, rank FROM entries WHERE is_dir = 0 AND ext IN ({marks})',
+                list(extensions)).fetchall()
+
+    def plays(self):
+        with self._connection() as conn:
+            return dict(conn.execute('SELECT path, played_at FROM plays'))
+
+    def record_play(self, path, played_at):
+        with self._connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO plays (path, played_at) VALUES (?, ?)', (path, played_at))
+
+    def find(self, name, file_type='file'):
+        needle = name.lower()
+        is_dir = 1 if file_type == 'folder' else 0
+        # Same semantics as fnmatch(f"*{name}*"): case-insensitive substring, priority roots first
+        with self._connection() as conn:
+            if self.trigram and len(needle) >= 3:
+                # A quoted trigram phrase matches names containing the needle verbatim
+                row = conn.execute(
+                    'SELECT e.path FROM entries_fts JOIN entries e ON e.rowid = entries_fts.rowid '
+                    'WHERE entries_fts MATCH ? AND e.is_dir = ? ORDER BY e.rank, e.depth, e.path LIMIT 1',
+                    ('"' + needle.replace('"', '""') + '"', is_dir)).fetchone()
+            else:
+                # Needles under three characters have no trigram to look up
+                row = conn.execute(
+                    'SELECT path FROM entries WHERE is_dir = ? AND instr(name, ?) > 0 '
+                    'ORDER BY rank, depth, path LIMIT 1',
+                    (is_dir, needle)).fetchone()
+        return row[0] if row else None
+
+    def find_named(self, name, file_type='file', ranks=None):
+        # Exact (case-insensitive) name rather than find()'s substring, optionally only under the given root ranks
+        is_dir = 1 if file_type == 'folder' else 0
+        query = 'SELECT path FROM entries WHERE is_dir = ? AND name = ?'
+        params = [is_dir, name.lower()]
+        if ranks is not None:
+            if not ranks:
+                return None
+            query += f" AND rank IN ({', '.join('?' * len(ranks))})"
+            params += sorted(ranks)
+        with self._connection() as conn:
+            row = conn.execute(query + ' ORDER BY rank, depth, path LIMIT 1', params).fetchone()
+        return row[0] if row else None
+
+    def remove(self, path):
+        with self._write_lock, self._connection() as conn:
+            conn.execute('DELETE FROM entries WHERE path = ?', (path,))
+        self.generation += 1
+
+    def rebuild(self, roots):
+        roots = [os.path.normpath(root) for root in roots]
+        with self._write_lock, self._connection() as conn:
+            if self.trigram:
+                # Indexing the finished table in one pass is several times faster than the triggers
+                conn.execute('DROP TRIGGER IF EXISTS entries_fts_insert')
+                conn.execute('DROP TRIGGER IF EXISTS entries_fts_delete')
+            conn.execute('DELETE FROM entries')
+            conn.execute('DELETE FROM dirs')
+            total = 0
+            for rank, root in enumerate(roots):
+                if not os.path.isdir(root) or root in roots[:rank]:
+                    continue
+                total += self._scan_tree(conn, root, rank, 0, self._skip_for(roots, rank))
+            if self.trigram:
+                conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+                for statement in FTS_TRIGGERS:
+                    conn.execute(statement)
+            self._set_meta(conn, 'roots', json.dumps(roots))
+            self._set_meta(conn, 'built_at', datetime.utcnow().isoformat())
+        self.generation += 1
+        return total
+
+    def refresh(self):
+        # Only directories whose mtime moved are listed again; a directory's mtime
+        # changes whenever an entry is created, removed or renamed directly inside it.
+        # The stat sweep runs without the write lock, which is only held while a chunk
+        # of changed directories is rescanned, so targeted refreshes never wait for it.
+        roots = self.roots()
+        if not roots:
+            return 0
+        with self._connection() as conn:
+            known = {path: (mtime, rank, depth)
+                     for path, mtime, rank, depth in conn.execute('SELECT path, mtime, rank, depth FROM dirs')}
+        new_roots = [(rank, root) for rank, root in enumerate(roots)
+                     if root not in known and root not in roots[:rank] and os.path.isdir(root)]
+        changed = []
+        for path in sorted(known):
+            mtime, rank, depth = known[path]
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                changed.append((path, rank, depth))
+
+        rescanned = 0
+        if new_roots:
+            with self._write_lock, self._connection() as conn:
+                for rank, root in new_roots:
+                    self._scan_tree(conn, root, rank, 0, self._skip_for(roots, rank))
+                    rescanned += 1
+        for start in range(0, len(changed), REFRESH_CHUNK):
+            with self._write_lock, self._connection() as conn:
+                # A vanished directory comes back from _list_dir as None and drops its subtree
+                for path, rank, depth in changed[start:start + REFRESH_CHUNK]:
+                    self._rescan_dir(conn, path, rank, depth, self._skip_for(roots, rank))
+                    rescanned += 1
+            time.sleep(0)
+        with self._write_lock, self._connection() as conn:
+            self._set_meta(conn, 'built_at', datetime.utcnow().isoformat())
+        if rescanned:
+            self.generation += 1
+        return rescanned
+
+    def refresh_dirs(self, paths):
+        # Targeted rescan for directories known to have changed (watcher events, our own file operations)
+        roots = self.roots()
+        rescanned = 0
+        with self._write_lock, self._connection() as conn:
+            for path in sorted(set(os.path.normpath(p) for p in paths)):
+                row = conn.execute('SELECT rank, depth FROM dirs WHERE path = ?', (path,)).fetchone()
+                if row is None:
+                    continue
+                rank, depth = row
+                self._rescan_dir(conn, path, rank, depth, self._skip_for(roots, rank))
+                rescanned += 1
+        if rescanned:
+            self.generation += 1
+        return rescanned
+
+    def dirs_under(self, path):
+        path = os.path.normpath(path)
+        prefix, upper = subtree_bounds(path)
+        with self._connection() as conn:
+            return [row[0] for row in conn.execute(
+                'SELECT path FROM dirs WHERE path = ? OR (path >= ? AND path < ?)', (path, prefix, upper))]
+
+    def _skip_for(self, roots, rank):
+        # Anything under a higher-priority root is already indexed with that root's rank
+        return set(roots[:rank]) | EXCLUDED_DIRS
+
+    def _list_dir(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                children = [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in it]
+        except OSError:
+            return None, []
+        return mtime, children
+
+    def _scan_tree(self, conn, root, rank, depth, skip):
+        rows = []
+        total = 0
+        stack = [(root, depth)]
+        while stack:
+            dirpath, dir_depth = stack.pop()
+            mtime, children = self._list_dir(dirpath)
+            if mtime is None:
+                continue
+            conn.execute('INSERT OR REPLACE INTO dirs (path, mtime, rank, depth) VALUES (?, ?, ?, ?)',
+                         (dirpath, mtime, rank, dir_depth))
+            subdirs = []
+            for name, is_dir in children:
+                path = os.path.join(dirpath, name)
+                if is_dir and path in skip:
+                    continue
+                rows.append(self._entry_row(path, dirpath, name, is_dir, rank, dir_depth))
+                if is_dir:
+                    subdirs.append((path, dir_depth + 1))
+            # Reversed so the stack pops subdirectories in listing order, like os.walk
+            stack.extend(reversed(subdirs))
+            if len(rows) >= BATCH_SIZE:
+                total += self._insert(conn, rows)
+                rows = []
+        if rows:
+            total += self._insert(conn, rows)
+        return total
+
+    def _rescan_dir(self, conn, dirpath, rank, depth, skip):
+        mtime, children = self._list_dir(dirpath)
+        if mtime is None:
+            self._drop_subtree(conn, dirpath)
+            return
+        old_dirs = {path for (path,) in conn.execute(
+            'SELECT path FROM entries WHERE parent = ? AND is_dir = 1', (dirpath,))}
+        conn.execute('DELETE FROM entries WHERE parent = ?', (dirpath,))
+        conn.execute('UPDATE dirs SET mtime = ? WHERE path = ?', (mtime, dirpath))
+        rows = []
+        new_dirs = set()
+        for name, is_dir in children:
+            path = os.path.join(dirpath, name)
+            if is_dir and path in skip:
+                continue
+            rows.append(self._entry_row(path, dirpath, name, is_dir, rank, depth))
+            if is_dir:
+                new_dirs.add(path)
+        self._insert(conn, rows)
+        for path in old_dirs - new_dirs:
+            self._drop_subtree(conn, path)
+        for path in new_dirs:
+            if conn.execute('SELECT 1 FROM dirs WHERE path = ?', (path,)).fetchone() is None:
+                self._scan_tree(conn, path, rank, depth + 1, skip)
+
+    def _drop_subtree(self, conn, path):
+        prefix, upper = subtree_bounds(path)
+        for table in ('entries', 'dirs'):
+            conn.execute(f'DELETE FROM {table} WHERE path = ? OR (path >= ? AND path < ?)',
+                         (path, prefix, upper))
+
+    def _entry_row(self, path, parent, name, is_dir, rank, depth):
+        name = name.lower()
+        ext = '' if is_dir else os.path.splitext(name)[1][1:]
+        mtime = None
+        if ext in MEDIA_EXTENSIONS:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return path, parent, name, ext, int(is_dir), rank, depth, mtime
+
+    def _insert(self, conn, rows):
+        conn.executemany(
+            'INSERT OR IGNORE INTO entries (path, parent, name, ext, is_dir, rank, depth, mtime) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            rows)
+        return len(rows)
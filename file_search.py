@@ -0,0 +1,155 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from file_index import EXCLUDED_DIRS
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class SearchTimeout(SearchCancelled):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class _SearchState:
+    def __init__(self, cancel, deadline):
+        self.cancel = cancel
+        self.deadline = deadline
+        self.best = None
+        self.done = False
+        self._lock = threading.Lock()
+
+    def found(self, key):
+        with self._lock:
+            if self.best is None or key < self.best:
+                self.best = key
+
+    def should_stop(self, key):
+        if self.done or (self.cancel is not None and self.cancel.cancelled):
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        # A confirmed match with a smaller key already beats anything this task can find
+        best = self.best
+        return best is not None and best < key
+
+    def remaining(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self.cancel is not None and self.cancel.cancelled:
+            raise SearchCancelled()
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchTimeout()
+
+
+class ParallelSearch:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+
+    def find(self, roots, name, file_type='file', deadline=None, cancel=None):
+        # Results match a sequential top-down os.walk of the roots in order: every root is
+        # split into its own listing plus one task per top-level subtree, and tasks are
+        # keyed (root rank, subtree position) so the smallest matching key wins.
+        needle = name.lower()
+        want_dir = file_type == 'folder'
+        roots = [os.path.normpath(root) for root in roots]
+        state = _SearchState(cancel, deadline)
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            listings = []
+            for rank, root in enumerate(roots):
+                if root in roots[:rank] or not os.path.isdir(root):
+                    continue
+                skip = set(roots[:rank]) | EXCLUDED_DIRS
+                listings.append((rank, skip, pool.submit(self._list_root, root, needle, want_dir)))
+
+            tasks = []
+            for rank, skip, future in listings:
+                match, subdirs = self._result(future, state)
+                tasks.append((match, None))
+                if match is not None:
+                    state.found((rank, 0))
+                for position, subdir in enumerate(subdirs, start=1):
+                    if subdir in skip:
+                        continue
+                    key = (rank, position)
+                    tasks.append((None, pool.submit(self._walk, subdir, needle, want_dir, skip, key, state)))
+
+            # Tasks are already in priority order
+            for match, future in tasks:
+                if future is not None:
+                    match = self._result(future, state)
+                if match is not None:
+                    return match
+            return None
+        finally:
+            state.done = True
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _result(self, future, state):
+        while True:
+            state.check()
+            try:
+                # Wake up periodically so a cancel token is noticed without a deadline
+                timeout = state.remaining()
+                return future.result(timeout=0.1 if timeout is None else min(timeout, 0.1))
+            except FutureTimeout:
+                continue
+
+    def _list_root(self, root, needle, want_dir):
+        match = None
+        subdirs = []
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if is_dir:
+                        subdirs.append(entry.path)
+                    if match is None and is_dir == want_dir and needle in entry.name.lower():
+                        match = entry.path
+        except OSError:
+            pass
+        return match, subdirs
+
+    def _walk(self, top, needle, want_dir, skip, key, state):
+        stack = [top]
+        while stack:
+            if state.should_stop(key):
+                return None
+            directory = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir == want_dir and needle in entry.name.lower():
+                    state.found(key)
+                    return entry.path
+                if is_dir and entry.path not in skip:
+                    subdirs.append(entry.path)
+            stack.extend(reversed(subdirs))
+        return None
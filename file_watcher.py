@@ -0,0 +1,223 @@
+import os
+import sys
+import time
+import errno
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+
+# inotify(7) event masks
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    def __init__(self, index, roots=None, batch_window=0.5, max_latency=2.0,
+                 max_batch=200, poll_interval=300, sweep_interval=1800):
+        self.index = index
+        self.roots = roots
+        self.batch_window = batch_window
+        self.max_latency = max_latency
+        self.max_batch = max_batch
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self.mode = None
+        self._stop = threading.Event()
+        self._threads = []
+        self._inotify = None
+        self._watches = {}
+        self._watched_paths = {}
+        self._touched = queue.Queue()
+        self._polling = False
+        self._touch_thread = None
+        self._spawn_lock = threading.Lock()
+
+    def start(self):
+        # inotify keeps the watched roots current. An mtime sweep of the whole index runs
+        # every poll_interval when inotify is unavailable or runs out of watches, and every
+        # sweep_interval alongside it for the parts of the disk nobody watches. Queue
+        # overflows trigger a one-off sweep.
+        self.mode = 'polling'
+        if sys.platform.startswith('linux'):
+            try:
+                self._inotify = Inotify()
+                self.mode = 'inotify'
+            except (OSError, AttributeError):
+                self._inotify = None
+        if self._inotify is not None:
+            for root in self.roots or self.index.roots():
+                if not self._watch_tree(root):
+                    break
+            self._spawn(self._inotify_loop)
+        else:
+            self._polling = True
+        self._spawn(self._poll_loop)
+        return self.mode
+
+    def touch(self, dirs):
+        # Directories our own file operations changed; rescanned on the watcher's thread
+        # so the command that changed them never waits on the index
+        self._touched.put(list(dirs))
+        with self._spawn_lock:
+            if self._touch_thread is None:
+                self._touch_thread = self._spawn(self._touch_loop)
+
+    def _start_polling(self):
+        # The sweep loop is already running; it just sweeps more often from now on
+        self._polling = True
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _spawn(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    def _watch_tree(self, path):
+        for directory in self.index.dirs_under(path):
+            if directory in self._watched_paths:
+                continue
+            try:
+                wd = self._inotify.add_watch(directory)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    # Out of watches: the poll loop picks up the directories left unwatched
+                    self._start_polling()
+                    return False
+                continue
+            self._watches[wd] = directory
+            self._watched_paths[directory] = wd
+        return True
+
+    def _inotify_loop(self):
+        dirty = set()
+        new_dirs = set()
+        overflow = False
+        first_event = None
+        last_event = None
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._inotify.fd], [], [], self.batch_window)
+            now = time.monotonic()
+            if readable:
+                for wd, mask, name in self._inotify.read_events():
+                    if mask & IN_Q_OVERFLOW:
+                        overflow = True
+                        continue
+                    directory = self._watches.get(wd)
+                    if directory is None:
+                        continue
+                    if mask & IN_IGNORED:
+                        self._watches.pop(wd, None)
+                        self._watched_paths.pop(directory, None)
+                        continue
+                    if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        dirty.add(os.path.dirname(directory))
+                        continue
+                    dirty.add(directory)
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        new_dirs.add(os.path.join(directory, name))
+                first_event = first_event or now
+                last_event = now
+            if not (dirty or overflow):
+                continue
+            # Coalesce a storm into one batch: wait for a quiet window, but never longer than max_latency
+            quiet = now - last_event >= self.batch_window
+            if quiet or now - first_event >= self.max_latency or len(dirty) >= self.max_batch:
+                self._flush(dirty, new_dirs, overflow)
+                dirty, new_dirs, overflow = set(), set(), False
+                first_event = last_event = None
+
+    def _flush(self, dirty, new_dirs, overflow):
+        if overflow:
+            # The kernel dropped events, so fall back to an mtime sweep and re-watch anything new
+            self.index.refresh()
+            new_dirs = self.roots or self.index.roots()
+        else:
+            pending = sorted(dirty)
+            for start in range(0, len(pending), self.max_batch):
+                self.index.refresh_dirs(pending[start:start + self.max_batch])
+                # Let lookups on other threads in between chunks of a large batch
+                time.sleep(0)
+        for path in new_dirs:
+            self._watch_tree(path)
+
+    def _touch_loop(self):
+        while not self._stop.is_set():
+            try:
+                dirty = set(self._touched.get(timeout=1))
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    dirty.update(self._touched.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(dirty, (), False)
+
+    def _poll_loop(self):
+        last = time.monotonic()
+        while not self._stop.wait(1):
+            interval = self.poll_interval if self._polling else self.sweep_interval
+            if time.monotonic() - last >= interval:
+                self.index.refresh()
+                last = time.monotonic()
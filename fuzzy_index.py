@@ -0,0 +1,171 @@
+import os
+import re
+import time
+import threading
+from array import array
+from collections import defaultdict
+
+import numpy as np
+from rapidfuzz import fuzz
+
+# How transcribed speech spells out filename punctuation
+SPOKEN_SYMBOLS = [
+    (re.compile(r'\s*\bdot\b\s*'), '.'),
+    (re.compile(r'\s*\bunderscore\b\s*'), '_'),
+    (re.compile(r'\s*\b(?:dash|hyphen)\b\s*'), '-'),
+]
+SEPARATORS = re.compile(r'[\W_]+')
+EXTENSION = re.compile(r'\.[a-z0-9]{1,5}')
+
+CANDIDATES = 200       # trigram hits re-ranked with RapidFuzz
+COMMON_GRAM_RATIO = 20  # grams in more than 1/20 of all names are skipped when rarer ones exist
+MIN_SIMILARITY = 85     # stem similarity a fuzzy hit needs before it is opened (never deleted) without asking
+MIN_CANDIDATE_SIMILARITY = 60  # below this a name isn't offered as "did you mean" at all
+REBUILD_INTERVAL = 60   # seconds between background rebuilds while the filesystem keeps changing
+
+
+def normalize_spoken(text):
+    text = text.lower()
+    for pattern, symbol in SPOKEN_SYMBOLS:
+        text = pattern.sub(symbol, text)
+    return text
+
+
+def normalize(name):
+    # "Final_Report-draft.DOCX" becomes "final report draft docx"
+    return SEPARATORS.sub(' ', name.lower()).strip()
+
+
+def normalize_query(text):
+    # ...and so does the transcription "final report underscore draft dot docx"
+    return normalize(normalize_spoken(text))
+
+
+def split_query(text):
+    # "tax return dot pdf" -> ("tax return", ".pdf"); without a plausible extension the whole query is the stem
+    spoken = normalize_spoken(text).strip()
+    stem, extension = os.path.splitext(spoken)
+    if not EXTENSION.fullmatch(extension):
+        return normalize(spoken), ''
+    return normalize(stem), extension
+
+
+def trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.paths = []
+        self.ranks = np.zeros(0, dtype=np.int16)
+        self.file_mask = np.zeros(0, dtype=bool)
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.paths)
+
+    def build(self, rows):
+        paths = []
+        ranks = array('h')
+        is_dirs = array('b')
+        postings = defaultdict(lambda: array('i'))
+        for i, (path, name, is_dir, rank) in enumerate(rows):
+            paths.append(path)
+            ranks.append(rank)
+            is_dirs.append(is_dir)
+            for gram in trigrams(normalize(name)):
+                postings[gram].append(i)
+        self.paths = paths
+        self.ranks = np.frombuffer(ranks, dtype=np.int16)
+        self.file_mask = np.frombuffer(is_dirs, dtype=np.int8) == 0
+        self.postings = {gram: np.frombuffer(ids, dtype=np.int32) for gram, ids in postings.items()}
+        return self
+
+    def search(self, query, file_type='file', k=5):
+        # A file must have the extension the query names, and only the stems are compared:
+        # WRatio's partial matching rated song_lyrics.txt 85 for "song.mp3"
+        stem, extension = split_query(query) if file_type == 'file' else (normalize_query(query), '')
+        query = normalize_query(query)
+        lists = sorted((self.postings[g] for g in trigrams(query) if g in self.postings), key=len)
+        if not lists:
+            return []
+        # Very common grams ("doc", "txt") cost the most and discriminate the least
+        cap = max(len(lists[0]), len(self.paths) // COMMON_GRAM_RATIO)
+        ids = np.concatenate([ids for ids in lists if len(ids) <= cap])
+        candidates, hits = np.unique(ids, return_counts=True)
+        keep = self.file_mask[candidates] == (file_type == 'file')
+        candidates, hits = candidates[keep], hits[keep]
+        if len(candidates) > CANDIDATES:
+            candidates = candidates[np.argpartition(hits, -CANDIDATES)[-CANDIDATES:]]
+
+        scored = []
+        for i in candidates:
+            path = self.paths[i]
+            name = os.path.basename(path).lower()
+            if file_type == 'file':
+                name, name_extension = os.path.splitext(name)
+                if extension and name_extension != extension:
+                    continue
+            similarity = fuzz.token_sort_ratio(stem, normalize(name))
+            scored.append((similarity, int(self.ranks[i]), path))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        # Only the best few are worth a stat() for recency
+        now = time.time()
+        results = []
+        for similarity, rank, path in scored[:k * 3]:
+            try:
+                age_days = max(0.0, now - os.stat(path).st_mtime) / 86400
+            except OSError:
+                continue
+            recency = 1 / (1 + age_days / 30)
+            priority = 1 / (1 + rank)
+            score = 0.8 * similarity / 100 + 0.1 * recency + 0.1 * priority
+            results.append((path, similarity, score))
+        results.sort(key=lambda item: -item[2])
+        return results[:k]
+
+
+class FuzzyFinder:
+    # Keeps a TrigramIndex in step with a FileIndex, rebuilding in the background when it changes
+    def __init__(self, file_index):
+        self.file_index = file_index
+        self.trigrams = None
+        self._generation = None
+        self._building = False
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def rebuild(self):
+        try:
+            generation = self.file_index.generation
+            trigrams = TrigramIndex().build(self.file_index.entries())
+            with self._lock:
+                self.trigrams = trigrams
+                self._generation = generation
+                self._built_at = time.monotonic()
+        finally:
+            self._building = False
+
+    def ensure_current(self):
+        with self._lock:
+            if self._building or self._generation == self.file_index.generation:
+                return
+            if self.trigrams is not None and time.monotonic() - self._built_at < REBUILD_INTERVAL:
+                return
+            self._building = True
+        threading.Thread(target=self.rebuild, daemon=True).start()
+
+    def search(self, name, file_type='file', k=5):
+        self.ensure_current()
+        trigrams = self.trigrams
+        if trigrams is None:
+            return []
+        return trigrams.search(name, file_type, k)
+
+    def best_match(self, name, file_type='file'):
+        results = self.search(name, file_type, k=1)
+        if results and results[0][1] >= MIN_SIMILARITY:
+            return results[0][0]
+        return None
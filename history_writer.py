@@ -0,0 +1,113 @@
+import sys
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+HISTORY_BATCH = 256  # rows written per transaction at most
+HISTORY_FLUSH_SECONDS = 0.5  # longest a logged command waits before it is written
+
+
+class HistoryWriter:
+    # Logging a command only appends to a queue. A background thread writes whatever has
+    # piled up as one transaction (a single executemany for plain rows) once HISTORY_BATCH
+    # rows are waiting or the oldest has waited HISTORY_FLUSH_SECONDS, so a command never
+    # waits on a commit and a burst of commands shares one fsync.
+    def __init__(self, db_engine, history_table, feedback_table, batch_size=HISTORY_BATCH,
+                 interval=HISTORY_FLUSH_SECONDS, on_feedback=None):
+        self.db_engine = db_engine
+        self.history = history_table
+        self.feedback = feedback_table
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_feedback = on_feedback
+        self.queue = queue.Queue()
+        self.stats = {'rows': 0, 'batches': 0, 'largest_batch': 0, 'errors': 0}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                # Whatever is still buffered when the interpreter exits gets written first
+                atexit.register(self.stop)
+
+    def log(self, command_text, intent, user_id, confirmed=False):
+        # confirmed: the user chose this intent, so it is also recorded as feedback
+        self.queue.put((command_text, intent, user_id, datetime.utcnow(), confirmed))
+
+    def flush(self, timeout=None):
+        # Blocks until everything logged before the call has been written
+        if self._thread is None:
+            return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=10):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            atexit.unregister(self.stop)
+            self.queue.put(None)
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            deadline = time.monotonic() + self.interval
+            batch, waiters, stopping = [], [], False
+            while True:
+                if item is None:
+                    stopping = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stopping:
+                return
+
+    def _write(self, batch):
+        confirmed = False
+        try:
+            with self.db_engine.begin() as connection:
+                plain = []
+                for command_text, intent, user_id, timestamp, feedback in batch:
+                    row = {'command_text': command_text, 'intent': intent, 'user_id': user_id, 'timestamp': timestamp}
+                    if not feedback:
+                        plain.append(row)
+                        continue
+                    # Feedback needs its history row's id, so these (rare) rows go in one at a time
+                    if plain:
+                        connection.execute(self.history.insert(), plain)
+                        plain = []
+                    history_id = connection.execute(self.history.insert(), row).inserted_primary_key[0]
+                    connection.execute(self.feedback.insert(), {'history_id': history_id, 'intent': intent,
+                                                                'timestamp': timestamp})
+                    confirmed = True
+                if plain:
+                    connection.execute(self.history.insert(), plain)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Couldn't write command history: {e}", file=sys.stderr)
+            return
+        self.stats['rows'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+        if confirmed and self.on_feedback is not None:
+            self.on_feedback()
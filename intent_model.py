@@ -0,0 +1,109 @@
+import os
+import re
+import json
+from collections import Counter
+
+import numpy as np
+
+COMPACT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'file_assistant_model')
+
+
+def export_compact(pipeline, path=COMPACT_MODEL_PATH):
+    # Writes the fitted TF-IDF + LogisticRegression pipeline as plain arrays plus a JSON
+    # header, so serving needs neither sklearn nor a matching sklearn version.
+    vectorizer, classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+    if vectorizer.analyzer != 'word' or vectorizer.preprocessor or vectorizer.tokenizer or vectorizer.strip_accents:
+        raise ValueError("Only word analyzers with the default preprocessing can be exported")
+    multi_class = getattr(classifier, 'multi_class', 'auto')
+    os.makedirs(path, exist_ok=True)
+    meta = {
+        'lowercase': vectorizer.lowercase,
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'stop_words': sorted(vectorizer.get_stop_words() or []),
+        'binary': vectorizer.binary,
+        'sublinear_tf': vectorizer.sublinear_tf,
+        'norm': vectorizer.norm,
+        'vocabulary': {term: int(index) for term, index in vectorizer.vocabulary_.items()},
+        'classes': [str(c) for c in classifier.classes_],
+        'multi_class': 'ovr' if multi_class == 'ovr' else 'multinomial',
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    np.save(os.path.join(path, 'idf.npy'), vectorizer.idf_.astype(np.float64))
+    np.save(os.path.join(path, 'coef.npy'), classifier.coef_.astype(np.float64))
+    np.save(os.path.join(path, 'intercept.npy'), classifier.intercept_.astype(np.float64))
+
+
+class CompactIntentModel:
+    # NumPy-only replica of TfidfVectorizer.transform + LogisticRegression.predict_proba
+    def __init__(self, path=COMPACT_MODEL_PATH):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.lowercase = meta['lowercase']
+        self.token_pattern = re.compile(meta['token_pattern'])
+        self.min_n, self.max_n = meta['ngram_range']
+        self.stop_words = frozenset(meta['stop_words'])
+        self.binary = meta['binary']
+        self.sublinear_tf = meta['sublinear_tf']
+        self.norm = meta['norm']
+        self.vocabulary = meta['vocabulary']
+        self.classes_ = np.array(meta['classes'], dtype=object)
+        self.multi_class = meta['multi_class']
+        self.idf = np.load(os.path.join(path, 'idf.npy'), mmap_mode='r')
+        self.coef = np.load(os.path.join(path, 'coef.npy'), mmap_mode='r')
+        self.intercept = np.load(os.path.join(path, 'intercept.npy'), mmap_mode='r')
+
+    @staticmethod
+    def exists(path=COMPACT_MODEL_PATH):
+        return os.path.exists(os.path.join(path, 'meta.json'))
+
+    def _terms(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = [t for t in self.token_pattern.findall(text) if t not in self.stop_words]
+        if self.min_n == 1 and self.max_n == 1:
+            return tokens
+        terms = tokens[:] if self.min_n == 1 else []
+        for n in range(max(2, self.min_n), self.max_n + 1):
+            terms.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def transform(self, commands):
+        X = np.zeros((len(commands), len(self.idf)))
+        for row, command in enumerate(commands):
+            counts = Counter(self.vocabulary[t] for t in self._terms(command) if t in self.vocabulary)
+            for column, count in counts.items():
+                X[row, column] = 1 if self.binary else count
+        if self.sublinear_tf:
+            # 1 + log(tf) for every present term; a term seen once has log(tf) == 0, so the mask comes first
+            present = X > 0
+            np.log(X, where=present, out=X)
+            X[present] += 1
+        X *= self.idf
+        if self.norm == 'l2':
+            norms = np.sqrt((X * X).sum(axis=1, keepdims=True))
+        elif self.norm == 'l1':
+            norms = np.abs(X).sum(axis=1, keepdims=True)
+        else:
+            return X
+        np.divide(X, norms, out=X, where=norms > 0)
+        return X
+
+    def decision_function(self, commands):
+        return self.transform(commands) @ self.coef.T + self.intercept
+
+    def predict_proba(self, commands):
+        scores = self.decision_function(list(commands))
+        if scores.shape[1] == 1:
+            positive = 1 / (1 + np.exp(-scores[:, 0]))
+            return np.column_stack([1 - positive, positive])
+        if self.multi_class == 'ovr':
+            probabilities = 1 / (1 + np.exp(-scores))
+            return probabilities / probabilities.sum(axis=1, keepdims=True)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict(self, commands):
+        return self.classes_[self.predict_proba(commands).argmax(axis=1)]
@@ -0,0 +1,110 @@
+import os
+import time
+import random
+import threading
+from collections import OrderedDict
+
+from file_index import MEDIA_TYPES
+
+STRATEGIES = ('random', 'most_recent', 'least_recently_played')
+RELOAD_INTERVAL = 60  # seconds between background reloads while the filesystem keeps changing
+
+
+class MediaPartition:
+    def __init__(self, rows, plays):
+        self.paths = [row[0] for row in rows]
+        # Newest first, so "most recent" is the head of the list
+        self.recent = [row[0] for row in sorted(rows, key=lambda row: row[2] or 0, reverse=True)]
+        # Never-played files first, then oldest play first; a play moves the file to the back
+        order = sorted(self.paths, key=lambda path: plays.get(path, 0.0))
+        self.rotation = OrderedDict((path, None) for path in order)
+        self.removed = set()
+
+    def __len__(self):
+        return len(self.paths) - len(self.removed)
+
+    def pick(self, strategy):
+        if strategy == 'random':
+            return random.choice(self.paths)
+        if strategy == 'most_recent':
+            return next(path for path in self.recent if path not in self.removed)
+        return next(iter(self.rotation))
+
+    def played(self, path):
+        if path in self.rotation:
+            self.rotation.move_to_end(path)
+
+    def discard(self, path):
+        # Stale entries are skipped lazily rather than shifting every list
+        self.removed.add(path)
+        self.rotation.pop(path, None)
+        if len(self.removed) * 2 > len(self.paths):
+            self.paths = [p for p in self.paths if p not in self.removed]
+            self.recent = [p for p in self.recent if p not in self.removed]
+            self.removed.clear()
+
+
+class MediaCatalog:
+    # Media files partitioned by type, loaded from the filename index's own scan; plays are
+    # persisted next to it. Each type has two tiers: files under the user's own roots, and
+    # everything the drive-wide scan found (system sounds and the like), used only when the
+    # first tier is empty. Only the first load happens on a pick: when the index changes,
+    # the catalog is reloaded in the background and picks keep using the old partitions
+    # (skipping files that have since gone) until the new ones are ready.
+    def __init__(self, file_index):
+        self.file_index = file_index
+        self.partitions = {}
+        self._generation = None
+        self._loading = False
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            generation = self.file_index.generation
+            plays = self.file_index.plays()
+            preferred = self.file_index.priority_ranks()
+            partitions = {}
+            for media_type, extensions in MEDIA_TYPES.items():
+                rows = self.file_index.media_entries(extensions)
+                partitions[media_type] = [MediaPartition([row for row in rows if row[3] in preferred], plays),
+                                          MediaPartition([row for row in rows if row[3] not in preferred], plays)]
+            with self._lock:
+                self.partitions = partitions
+                self._generation = generation
+                self._loaded_at = time.monotonic()
+        finally:
+            self._loading = False
+
+    def ensure_current(self):
+        with self._lock:
+            if self._loading or self._generation == self.file_index.generation:
+                return
+            loaded = self._generation is not None
+            if loaded and time.monotonic() - self._loaded_at < RELOAD_INTERVAL:
+                return
+            self._loading = True
+        if loaded:
+            threading.Thread(target=self.load, daemon=True).start()
+        else:
+            self.load()
+
+    def pick(self, media_type, strategy='random'):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown media selection strategy: {strategy}")
+        self.ensure_current()
+        with self._lock:
+            for partition in self.partitions.get(media_type, ()):
+                while partition:
+                    path = partition.pick(strategy)
+                    if os.path.exists(path):
+                        return path
+                    partition.discard(path)
+        return None
+
+    def mark_played(self, path):
+        with self._lock:
+            for tiers in self.partitions.values():
+                for partition in tiers:
+                    partition.played(path)
+        self.file_index.record_play(path, time.time())
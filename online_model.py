@@ -0,0 +1,82 @@
+import os
+import csv
+import pickle
+import threading
+
+import numpy as np
+
+ONLINE_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'online_model.pkl')
+SEED_EPOCHS = 10
+FEEDBACK_WEIGHT = 5.0  # one confirmed command should outweigh the odd stale training row
+
+
+class OnlineIntentModel:
+    # Logistic-loss SGD over hashed unigrams+bigrams. Hashing needs no fitted vocabulary,
+    # so a newly confirmed command is a single partial_fit and never a retrain. Like the
+    # other intent models it expects text that has already been through preprocess_text.
+    def __init__(self, path=ONLINE_MODEL_PATH):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.path = path
+        self.vectorizer = HashingVectorizer(n_features=2 ** 18, ngram_range=(1, 2), alternate_sign=False)
+        self.classifier = None
+        self.last_feedback_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def classes_(self):
+        return self.classifier.classes_
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'rb') as f:
+            state = pickle.load(f)
+        self.classifier = state['classifier']
+        self.last_feedback_id = state['last_feedback_id']
+        return True
+
+    def save(self):
+        temp = self.path + '.tmp'
+        with open(temp, 'wb') as f:
+            pickle.dump({'classifier': self.classifier, 'last_feedback_id': self.last_feedback_id}, f)
+        os.replace(temp, self.path)
+
+    def seed(self, texts, intents):
+        # One-off start from the labelled dataset; every later update is incremental
+        from sklearn.linear_model import SGDClassifier
+        X = self.vectorizer.transform(texts)
+        y = np.asarray(intents)
+        classifier = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42)
+        shuffle = np.random.RandomState(42)
+        for _ in range(SEED_EPOCHS):
+            order = shuffle.permutation(len(y))
+            classifier.partial_fit(X[order], y[order], classes=np.unique(y))
+        with self._lock:
+            self.classifier = classifier
+        self.save()
+
+    def seed_from_csv(self, path, preprocess):
+        with open(path, newline='') as f:
+            rows = [row for row in csv.DictReader(f) if row['Command'] and row['Intent']]
+        self.seed([preprocess(row['Command']) for row in rows], [row['Intent'] for row in rows])
+
+    def predict_proba(self, texts):
+        X = self.vectorizer.transform(texts)
+        with self._lock:
+            return self.classifier.predict_proba(X)
+
+    def learn(self, feedback):
+        # feedback: (feedback_id, preprocessed text, intent) rows newer than last_feedback_id
+        feedback = [row for row in feedback if row[0] > self.last_feedback_id]
+        if not feedback:
+            return 0
+        known = set(self.classifier.classes_)
+        rows = [(text, intent) for _, text, intent in feedback if intent in known]
+        if rows:
+            X = self.vectorizer.transform([text for text, intent in rows])
+            y = np.array([intent for text, intent in rows])
+            with self._lock:
+                self.classifier.partial_fit(X, y, sample_weight=np.full(len(y), FEEDBACK_WEIGHT))
+        self.last_feedback_id = max(row[0] for row in feedback)
+        self.save()
+        return len(rows)
@@ -0,0 +1,47 @@
+import re
+import sys
+import threading
+from functools import lru_cache
+
+# Same tokens train_model.py used to get from nltk's word_tokenize followed by
+# isalpha(): whitespace-separated words made only of letters, once surrounding
+# punctuation is stripped. "lecture_notes.pdf" or "mp3" contribute nothing.
+WORD = re.compile(r"""(?<!\S)['"(\[]*([^\W\d_]+)[.,!?;:'")\]]*(?!\S)""")
+
+_lemmatizer = None
+_lemmatizer_lock = threading.Lock()
+
+
+def _load_lemmatizer():
+    global _lemmatizer
+    with _lemmatizer_lock:
+        if _lemmatizer is None:
+            try:
+                from nltk.stem import WordNetLemmatizer
+                lemmatizer = WordNetLemmatizer()
+                lemmatizer.lemmatize('files')  # WordNet itself loads on first use
+                _lemmatizer = lemmatizer.lemmatize
+            except (ImportError, LookupError):
+                print("WordNet unavailable (pip install nltk; nltk.download('wordnet')), commands will not be lemmatized",
+                      file=sys.stderr)
+                _lemmatizer = str
+    return _lemmatizer
+
+
+def warm_up():
+    # Loading WordNet takes a second or two; do it off the first command's path
+    _load_lemmatizer()
+
+
+@lru_cache(maxsize=65536)
+def lemmatize(word):
+    return _load_lemmatizer()(word)
+
+
+def tokenize(text):
+    return WORD.findall(text.lower())
+
+
+def preprocess_text(text):
+    # Shared by train_model.py and CommandProcessor, so the model sees the same text at both ends
+    return ' '.join(map(lemmatize, tokenize(text)))
@@ -0,0 +1,156 @@
+import json
+import socket
+import asyncio
+import threading
+import http.client
+
+import pytest
+
+from assistant_engine import AssistantEngine
+from assistant_server import AssistantServer, is_loopback, load_token, send, send_websocket
+
+TOKEN = 'test-token'
+
+
+def free_port_pair():
+    # HTTP listens on the port and the WebSocket on the next one up
+    while True:
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        try:
+            with socket.socket() as s:
+                s.bind(('127.0.0.1', port + 1))
+            return port
+        except OSError:
+            continue
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp('server')
+    home = tmp / 'home'
+    (home / 'Documents').mkdir(parents=True)
+    (home / 'Documents' / 'notes.txt').write_text('x')
+    engine = AssistantEngine(db_url=f"sqlite:///{tmp / 'assistant.db'}", dry_run=True,
+                             index_path=str(tmp / 'index.db'))
+    engine.file_index.rebuild([str(home)])
+    server = AssistantServer(engine, None, workers=2, token=TOKEN)
+    port = free_port_pair()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve('127.0.0.1', port))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port + 1), timeout=1).close()
+            break
+        except OSError:
+            threading.Event().wait(0.05)
+    server.port, server.loop, server.home = port, loop, home
+    yield server
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(0)
+    engine.close()
+
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=30)
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def authorized(**headers):
+    return dict({'Authorization': f"Bearer {TOKEN}", 'Content-Type': 'application/json'}, **headers)
+
+
+def test_http_round_trip(server):
+    [reply] = send(["search for notes.txt"], port=server.port, token=TOKEN)
+    assert reply['intent'] == 'search_file'
+    assert reply['replies'] == [f"Found at: {server.home / 'Documents' / 'notes.txt'}"]
+
+
+def test_sessions_log_commands_per_user(server):
+    send(["open notes.txt"], user='alice', port=server.port, token=TOKEN)
+    server.engine.history.flush(timeout=5)
+    alice = server.engine.user_id('alice')
+    with server.engine.db.engine.connect() as connection:
+        users = [row[0] for row in connection.exec_driver_sql(
+            "SELECT user_id FROM command_history WHERE command_text = 'open notes.txt'")]
+    assert users == [alice]
+
+
+def test_websocket_round_trip(server):
+    pytest.importorskip('websockets')
+    replies = send_websocket(["search for notes.txt", "open folder documents"], user='bob',
+                             port=server.port, token=TOKEN)
+    assert [reply['id'] for reply in replies] == [0, 1]
+    assert [reply['type'] for reply in replies] == ['result', 'result']
+    assert replies[0]['intent'] == 'search_file'
+
+
+def test_requests_need_the_token(server):
+    status, reply = request(server, 'POST', '/command', json.dumps({'text': 'play music'}),
+                            {'Content-Type': 'application/json'})
+    assert status == 401
+    status, _ = request(server, 'GET', '/health', headers={'Authorization': 'Bearer wrong'})
+    assert status == 401
+    assert request(server, 'GET', '/health', headers=authorized())[0] == 200
+
+
+def test_websocket_handshake_needs_the_token(server):
+    pytest.importorskip('websockets')
+    from websockets.exceptions import InvalidStatus
+    from websockets.sync.client import connect
+    with pytest.raises(InvalidStatus):
+        connect(f"ws://127.0.0.1:{server.port + 1}")
+    connect(f"ws://127.0.0.1:{server.port + 1}/?token={TOKEN}").close()
+
+
+def test_browser_requests_are_refused(server):
+    body = json.dumps({'text': 'play music'})
+    assert request(server, 'POST', '/command', body, authorized(**{'Content-Type': 'text/plain'}))[0] == 415
+    assert request(server, 'POST', '/command', body, authorized(Origin='http://example.com'))[0] == 403
+    assert request(server, 'POST', '/audio', b'\0\0', authorized())[0] == 415
+
+
+def test_refused_before_the_body_is_read(server):
+    # Claims a large body and never sends it: the refusal must not wait for it
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as connection:
+        connection.sendall(b"POST /audio HTTP/1.1\r\nContent-Type: audio/wav\r\n"
+                           b"Content-Length: 1000000\r\n\r\n")
+        reply = connection.makefile('rb').read()
+    assert reply.startswith(b"HTTP/1.1 401 ")
+    assert b"Connection: close" in reply
+
+
+def test_remote_clients_cannot_delete(server):
+    session = server.default_session
+
+    def run(remote):
+        future = asyncio.run_coroutine_threadsafe(
+            server.execute('commands', 'delete notes.txt', session, remote), server.loop)
+        return future.result(30)
+
+    status, reply = run(remote=True)
+    assert reply['replies'] == ["Deleting, copying and moving files is turned off here."]
+    status, reply = run(remote=False)
+    assert reply['replies'] == [f"Would recycle {server.home / 'Documents' / 'notes.txt'}"]
+
+
+def test_is_loopback():
+    assert is_loopback('127.0.0.1') and is_loopback('::1') and is_loopback('localhost')
+    assert is_loopback('::ffff:127.0.0.1')
+    assert not is_loopback('0.0.0.0') and not is_loopback('192.168.1.5') and not is_loopback('')
+
+
+def test_token_file_is_created_private(tmp_path):
+    path = tmp_path / 'token'
+    assert load_token(str(path)) is None
+    token = load_token(str(path), create=True)
+    assert token and load_token(str(path)) == token
+    assert path.stat().st_mode & 0o777 == 0o600
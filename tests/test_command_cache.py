@@ -0,0 +1,68 @@
+import os
+
+from command_cache import CommandCache, CachedCommand, normalize_command
+
+
+def entry(intent='open_file'):
+    return CachedCommand(intent, None)
+
+
+def test_normalize_command():
+    assert normalize_command("  Open  folder\tDownloads?") == 'open folder downloads'
+    assert normalize_command("play music!!") == 'play music'
+    assert normalize_command("open notes.txt") == 'open notes.txt'
+
+
+def test_lookup_matches_normalized_commands():
+    cache = CommandCache()
+    stored = cache.store("Open folder Downloads", entry('open_folder'))
+    assert cache.lookup("open  folder downloads?") is stored
+    assert cache.lookup("open folder music") is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = CommandCache(maxsize=2)
+    cache.store('a', entry())
+    cache.store('b', entry())
+    cache.lookup('a')
+    cache.store('c', entry())
+    assert cache.lookup('b') is None
+    assert cache.lookup('a') is not None
+    assert cache.lookup('c') is not None
+    assert cache.stats()['size'] == 2
+
+
+def test_cached_path_is_checked_on_disk(tmp_path):
+    cache = CommandCache()
+    path = tmp_path / 'notes.txt'
+    path.write_text('x')
+    cached = cache.store('open notes.txt', entry())
+    cache.remember_path(cached, str(path))
+    assert cache.cached_path(cached) == str(path)
+    os.remove(path)
+    assert cache.cached_path(cached) is None
+    assert cached.path is None
+    assert cache.stats()['path_hits'] == 1
+    assert cache.stats()['path_misses'] == 1
+
+
+def test_cached_path_must_have_the_right_type(tmp_path):
+    cache = CommandCache()
+    cached = cache.store('open folder reports', entry('open_folder'))
+    cache.remember_path(cached, str(tmp_path), 'folder')
+    assert cache.cached_path(cached, 'folder') == str(tmp_path)
+    assert cache.cached_path(cached, 'file') is None
+
+    file_entry = cache.store('open reports', entry())
+    cache.remember_path(file_entry, str(tmp_path), 'file')
+    assert cache.cached_path(file_entry, 'file') is None
+
+
+def test_clear_forgets_everything():
+    cache = CommandCache()
+    cache.store('play music', entry('play_music'))
+    cache.clear()
+    assert cache.lookup('play music') is None
+    assert cache.stats()['size'] == 0
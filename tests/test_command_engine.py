@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from command_engine import CommandEngine
+from file_search import SearchCancelled
+
+
+def started(job):
+    while job.state == 'pending':
+        threading.Event().wait(0.01)
+    return job
+
+
+def wait_for_cancel(cancel):
+    # Stands in for a long search: runs until its token trips
+    while not cancel.cancelled:
+        threading.Event().wait(0.01)
+    raise SearchCancelled()
+
+
+@pytest.fixture
+def engine():
+    engine = CommandEngine(workers=1, max_pending=2)
+    yield engine
+    engine.shutdown()
+
+
+def test_jobs_run_and_report(engine):
+    job = engine.submit(lambda x, cancel: x * 2, 21)
+    assert job.finished.wait(5)
+    assert (job.state, job.result) == ('done', 42)
+    handled = []
+    engine.poll(handled.append)
+    assert handled == [job]
+
+
+def test_failures_are_kept(engine):
+    def fail(cancel):
+        raise ValueError('boom')
+
+    job = engine.submit(fail)
+    assert job.finished.wait(5)
+    assert job.state == 'failed' and isinstance(job.error, ValueError)
+
+
+def test_newer_command_supersedes_the_group(engine):
+    running = started(engine.submit(wait_for_cancel, group='voice'))
+    queued = engine.submit(wait_for_cancel, group='voice')
+    newest = engine.submit(lambda cancel: 'newest', group='voice', supersede=True)
+    assert newest is not None
+    for job in (running, queued, newest):
+        assert job.finished.wait(5)
+    assert (running.state, queued.state, newest.state) == ('cancelled', 'cancelled', 'done')
+
+
+def test_supersede_leaves_other_groups_alone(engine):
+    other = started(engine.submit(wait_for_cancel, group='text'))
+    engine.submit(lambda cancel: None, group='voice', supersede=True)
+    assert not other.finished.wait(0.2)
+    engine.cancel('text')
+    assert other.finished.wait(5) and other.state == 'cancelled'
+
+
+def test_timeout_cancels_the_job(engine):
+    job = engine.submit(wait_for_cancel, timeout=0.1)
+    assert job.finished.wait(5)
+    assert job.state == 'timeout' and job.timed_out
+
+
+def test_full_queue_rejects_new_work(engine):
+    running = started(engine.submit(wait_for_cancel))
+    queued = [engine.submit(wait_for_cancel) for _ in range(2)]
+    assert all(queued)
+    assert engine.submit(wait_for_cancel) is None
+    engine.cancel()
+    for job in [running] + queued:
+        assert job.finished.wait(5) and job.state == 'cancelled'
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from assistant_engine import AssistantEngine, FileManager
+from fuzzy_index import MIN_SIMILARITY
+from test_file_index import make_tree
+
+
+class AskingEngine(AssistantEngine):
+    # Stands in for a front-end with a user to answer: picks the first option offered
+    can_ask = True
+
+    def ask_choice(self, question, options):
+        self.asked.append([value for value, label in options])
+        return options[0][0]
+
+
+@pytest.fixture(scope='module')
+def home(tmp_path_factory):
+    home = str(tmp_path_factory.mktemp('engine') / 'home')
+    make_tree(home, ['Documents/notes.txt', 'Documents/test_fuzz.txt', 'Documents/copy (1).pdf',
+                     'Documents/tax_return.docx', 'Documents/budget.xlsx', 'Music/song_lyrics.txt',
+                     'Music/tune.mp3'])
+    return home
+
+
+def make_engine(cls, home, tmp_path, monkeypatch):
+    monkeypatch.setattr(FileManager, 'search_roots', classmethod(lambda cls: [home]))
+    engine = cls(db_url=f"sqlite:///{tmp_path / 'assistant.db'}", dry_run=True,
+                 index_path=str(tmp_path / 'index.db'))
+    engine.asked = []
+    engine.file_index.rebuild([home])
+    engine.file_manager.fuzzy.rebuild()
+    return engine
+
+
+@pytest.fixture
+def engine(home, tmp_path, monkeypatch):
+    engine = make_engine(AssistantEngine, home, tmp_path, monkeypatch)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def asking(home, tmp_path, monkeypatch):
+    engine = make_engine(AskingEngine, home, tmp_path, monkeypatch)
+    yield engine
+    engine.close()
+
+
+def run(engine, command, intent):
+    return engine.process_command(command, prediction=(intent, 1.0)).replies
+
+
+def test_exact_name_is_taken_for_deletes(engine, home):
+    path = os.path.join(home, 'Documents', 'notes.txt')
+    entry = engine.analyze_command('delete notes.txt', 'delete_file')
+    assert engine.resolve(entry, 'notes.txt', confirm=True) == path
+    assert run(engine, 'delete notes.txt', 'delete_file') == [f"Would recycle {path}"]
+
+
+def test_near_match_is_refused_when_nobody_can_be_asked(engine):
+    # "zz.txt" is a substring of test_fuzz.txt; "copy.pdf" is only similar to copy (1).pdf
+    entry = engine.analyze_command('delete zz.txt', 'delete_file')
+    assert engine.resolve(entry, 'zz.txt', confirm=True) is None
+    assert run(engine, 'delete copy.pdf', 'delete_file') == [
+        "Nothing is named exactly 'copy.pdf', and I won't act on a similar file without asking."]
+
+
+def test_near_match_is_offered_when_the_user_can_be_asked(asking, home):
+    path = os.path.join(home, 'Documents', 'test_fuzz.txt')
+    entry = asking.analyze_command('delete zz.txt', 'delete_file')
+    assert asking.resolve(entry, 'zz.txt', confirm=True) == path
+    assert asking.asked == [[path]]
+
+
+def test_missing_file_gets_one_reply(engine):
+    assert run(engine, 'delete ledger.pdf', 'delete_file') == ["File 'ledger.pdf' not found"]
+
+
+def test_best_match_threshold(engine, home):
+    fuzzy = engine.file_manager.fuzzy
+    assert fuzzy.best_match('budgets.xlsx') == os.path.join(home, 'Documents', 'budget.xlsx')
+    assert fuzzy.search('budgets.xlsx', k=1)[0][1] >= MIN_SIMILARITY
+    assert fuzzy.best_match('budget plan.xlsx') is None
+
+
+@pytest.mark.parametrize('command, name', [('open song.mp3', 'song.mp3'),
+                                           ('open tax return.pdf', 'tax return.pdf')])
+def test_fuzzy_open_keeps_the_extension(engine, command, name):
+    assert engine.file_manager.find_file_or_folder(name) is None
+    assert run(engine, command, 'open_file') == [f"File '{name}' not found"]
+
+
+def test_dry_run_records_no_plays(engine, home):
+    path = os.path.join(home, 'Music', 'tune.mp3')
+    assert run(engine, 'play music', 'play_music') == ["Now playing: tune.mp3"]
+    assert path not in engine.file_index.plays()
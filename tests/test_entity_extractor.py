@@ -0,0 +1,53 @@
+import os
+import csv
+
+import pytest
+
+from assistant_engine import CommandProcessor
+from entity_extractor import EntityExtractor
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'entity_corpus.csv')
+FIELDS = ('Filename', 'Extension', 'Folder', 'Destination')
+
+with open(CORPUS, newline='') as f:
+    ROWS = list(csv.DictReader(f))
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    # The same extension list the assistant serves with
+    return EntityExtractor(CommandProcessor().extensions)
+
+
+@pytest.mark.parametrize('row', ROWS, ids=[row['Command'] for row in ROWS])
+def test_corpus(extractor, row):
+    expected = tuple(row[field] or None for field in FIELDS)
+    assert tuple(extractor.extract(row['Command'])) == expected
+
+
+def test_entities_are_named(extractor):
+    entities = extractor.extract("move report.pdf to backup")
+    assert entities.filename == 'report.pdf'
+    assert entities.extension == 'pdf'
+    assert entities.destination == 'backup'
+
+
+@pytest.mark.parametrize('command', [
+    "open notes.txt.", "open notes.txt:", "open notes.txt?", "Open NOTES.TXT!", "open notes dot txt",
+])
+def test_filename_survives_punctuation_case_and_dictation(extractor, command):
+    assert extractor.extract(command).filename == 'notes.txt'
+
+
+def test_unknown_extensions_are_not_filenames(extractor):
+    entities = extractor.extract("open archive.xyz")
+    assert entities.filename is None
+    assert entities.extension is None
+
+
+def test_plural_file_type_still_names_the_extension(extractor):
+    assert extractor.extract("search my pc for pdfs").extension == 'pdf'
+
+
+def test_nothing_to_extract(extractor):
+    assert tuple(extractor.extract("")) == (None, None, None, None)
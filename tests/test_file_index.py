@@ -0,0 +1,156 @@
+import os
+
+import pytest
+
+from file_index import FileIndex
+
+
+def make_tree(root, paths):
+    for path in paths:
+        full = os.path.join(root, *path.split('/'))
+        if path.endswith('/'):
+            os.makedirs(full, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, 'w') as f:
+                f.write('x')
+
+
+@pytest.fixture
+def tree(tmp_path):
+    home, wide = tmp_path / 'home', tmp_path / 'wide'
+    make_tree(str(home), ['Documents/report.pdf', 'Documents/Backup/', 'Music/song.mp3'])
+    make_tree(str(wide), ['report.pdf', 'lib/test_fuzz.txt', 'Backup/'])
+    index = FileIndex(str(tmp_path / 'index.db'))
+    index.rebuild([str(home), str(wide)])
+    return index, str(home), str(wide)
+
+
+def test_unbuilt_index_finds_nothing(tmp_path):
+    index = FileIndex(str(tmp_path / 'index.db'))
+    assert not index.is_built()
+    assert index.find('report.pdf') is None
+
+
+def test_rebuild_counts_every_entry(tree):
+    index, home, wide = tree
+    assert index.is_built()
+    assert index.count() == 9
+
+
+def test_find_is_case_insensitive_substring(tree):
+    index, home, wide = tree
+    assert index.find('REPORT') == os.path.join(home, 'Documents', 'report.pdf')
+    assert index.find('fuzz') == os.path.join(wide, 'lib', 'test_fuzz.txt')
+
+
+def test_find_prefers_earlier_roots(tree):
+    index, home, wide = tree
+    assert index.find('report.pdf') == os.path.join(home, 'Documents', 'report.pdf')
+    assert index.find('backup', 'folder') == os.path.join(home, 'Documents', 'Backup')
+
+
+def test_find_separates_files_and_folders(tree):
+    index, home, wide = tree
+    assert index.find('documents') is None
+    assert index.find('documents', 'folder') == os.path.join(home, 'Documents')
+
+
+def test_find_named_needs_the_whole_name(tree):
+    index, home, wide = tree
+    assert index.find_named('zz.txt') is None
+    assert index.find_named('TEST_FUZZ.TXT') == os.path.join(wide, 'lib', 'test_fuzz.txt')
+
+
+def test_find_named_can_be_limited_to_ranks(tree):
+    index, home, wide = tree
+    assert index.find_named('test_fuzz.txt', ranks={0}) is None
+    assert index.find_named('backup', 'folder', ranks={1}) == os.path.join(wide, 'Backup')
+    assert index.find_named('backup', 'folder', ranks=set()) is None
+
+
+def test_remove_drops_a_stale_path(tree):
+    index, home, wide = tree
+    path = os.path.join(home, 'Music', 'song.mp3')
+    index.remove(path)
+    assert index.find('song') is None
+
+
+def test_index_survives_reopening(tree, tmp_path):
+    index, home, wide = tree
+    reopened = FileIndex(index.db_path)
+    assert reopened.is_built()
+    assert reopened.roots() == [home, wide]
+    assert reopened.find('song.mp3') == os.path.join(home, 'Music', 'song.mp3')
+
+
+def test_refresh_picks_up_renames_and_deletes(tree):
+    index, home, wide = tree
+    documents = os.path.join(home, 'Documents')
+    os.rename(os.path.join(documents, 'report.pdf'), os.path.join(documents, 'summary.pdf'))
+    os.remove(os.path.join(home, 'Music', 'song.mp3'))
+    assert index.refresh() == 2
+    assert index.find('summary.pdf') == os.path.join(documents, 'summary.pdf')
+    assert index.find('report.pdf') == os.path.join(wide, 'report.pdf')
+    assert index.find('song') is None
+
+
+def test_refresh_only_rescans_changed_directories(tree):
+    index, home, wide = tree
+    assert index.refresh() == 0
+    make_tree(wide, ['lib/new.txt'])
+    assert index.refresh() == 1
+    assert index.find('new.txt') == os.path.join(wide, 'lib', 'new.txt')
+
+
+def test_refresh_indexes_new_subtrees_and_drops_vanished_ones(tree):
+    index, home, wide = tree
+    make_tree(home, ['Projects/app/main.py'])
+    os.rename(os.path.join(wide, 'lib'), os.path.join(wide, 'src'))
+    index.refresh()
+    assert index.find('main.py') == os.path.join(home, 'Projects', 'app', 'main.py')
+    assert index.find('test_fuzz.txt') == os.path.join(wide, 'src', 'test_fuzz.txt')
+    assert os.path.join(wide, 'lib') not in index.dirs_under(wide)
+
+
+def test_refresh_dirs_rescans_only_the_given_directories(tree):
+    index, home, wide = tree
+    make_tree(home, ['Music/tune.mp3'])
+    make_tree(wide, ['lib/other.txt'])
+    assert index.refresh_dirs([os.path.join(home, 'Music'), os.path.join(home, 'missing')]) == 1
+    assert index.find('tune.mp3') is not None
+    assert index.find('other.txt') is None
+
+
+def test_short_and_quoted_needles(tree):
+    index, home, wide = tree
+    make_tree(home, ['Documents/say "hi".txt'])
+    index.refresh()
+    assert index.find('mp') == os.path.join(home, 'Music', 'song.mp3')
+    assert index.find('"hi"') == os.path.join(home, 'Documents', 'say "hi".txt')
+
+
+def test_substring_lookup_matches_a_plain_scan(tree):
+    index, home, wide = tree
+    needles = ['report', 'fuzz.t', 'backup', 'ong.mp', 'missing', 'doc']
+    expected = [index.find(needle, file_type) for needle in needles for file_type in ('file', 'folder')]
+    index.trigram = False
+    assert [index.find(needle, file_type) for needle in needles for file_type in ('file', 'folder')] == expected
+
+
+def test_rebuilding_keeps_the_trigram_index_in_step(tree):
+    index, home, wide = tree
+    make_tree(home, ['Music/other.mp3'])
+    index.rebuild([home, wide])
+    assert index.find('other.mp') == os.path.join(home, 'Music', 'other.mp3')
+    os.remove(os.path.join(home, 'Music', 'other.mp3'))
+    index.refresh()
+    assert index.find('other.mp') is None
+
+
+def test_exact_name_lookup_uses_the_name_index(tree):
+    index, home, wide = tree
+    with index._connection() as conn:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT path FROM entries WHERE is_dir = 0 AND name = ?', ('x',)))
+    assert 'idx_entries_name' in plan
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from assistant_engine import FileManager
+from file_index import FileIndex
+from test_file_index import make_tree
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    home = str(tmp_path / 'home')
+    make_tree(home, ['Documents/report.pdf', 'Videos/'])
+    index = FileIndex(str(tmp_path / 'index.db'))
+    index.rebuild([home])
+    # Keep the disk search inside the temporary tree
+    monkeypatch.setattr(FileManager, 'search_roots', classmethod(lambda cls: [home]))
+    return FileManager(index), home
+
+
+def test_index_hit(manager):
+    files, home = manager
+    assert files.find_file_or_folder('report.pdf') == os.path.join(home, 'Documents', 'report.pdf')
+
+
+def test_index_miss_falls_through_to_the_disk(manager):
+    files, home = manager
+    make_tree(home, ['Videos/holiday.mp4'])
+    assert files.find_file_or_folder('holiday.mp4', fuzzy=False) == os.path.join(home, 'Videos', 'holiday.mp4')
+
+
+def test_stale_index_entry_is_dropped_and_the_disk_searched(manager):
+    files, home = manager
+    os.rename(os.path.join(home, 'Documents', 'report.pdf'), os.path.join(home, 'Videos', 'report.pdf'))
+    assert files.find_file_or_folder('report.pdf') == os.path.join(home, 'Videos', 'report.pdf')
+    assert files.index.find('report.pdf') is None
+
+
+def test_missing_everywhere(manager):
+    files, home = manager
+    assert files.find_file_or_folder('nothing-like-it.xyz', fuzzy=False) is None
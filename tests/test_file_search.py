@@ -0,0 +1,69 @@
+import os
+import time
+import random
+import fnmatch
+
+import pytest
+
+from file_search import ParallelSearch, CancelToken, SearchCancelled, SearchTimeout
+
+SYLLABLES = ['ab', 'cd', 'ef', 'note', 'rep', 'mp', 'x']
+
+
+def walk_find(roots, name, file_type='file'):
+    # The sequential os.walk lookup ParallelSearch replaced, kept as the reference
+    for path in roots:
+        if os.path.exists(path):
+            for root, dirs, files in os.walk(path):
+                candidates = files if file_type == 'file' else dirs
+                for candidate in candidates:
+                    if fnmatch.fnmatch(candidate.lower(), f"*{name.lower()}*"):
+                        return os.path.join(root, candidate)
+    return None
+
+
+def random_tree(root, seed, dirs=40, files=120):
+    rng = random.Random(seed)
+    word = lambda: ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+    directories = [root]
+    for _ in range(dirs):
+        path = os.path.join(rng.choice(directories), word())
+        os.makedirs(path, exist_ok=True)
+        directories.append(path)
+    for _ in range(files):
+        path = os.path.join(rng.choice(directories), word() + rng.choice(['.txt', '.mp3', '.pdf']))
+        if not os.path.isdir(path):
+            open(path, 'w').close()
+    return directories
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_a_sequential_walk(tmp_path, seed):
+    root = str(tmp_path / 'tree')
+    directories = random_tree(root, seed)
+    rng = random.Random(seed)
+    # Overlapping roots: later roots skip what earlier ones already covered
+    roots = [rng.choice(directories), root, rng.choice(directories), str(tmp_path / 'missing')]
+    search = ParallelSearch(max_workers=4)
+    needles = SYLLABLES + ['ab.txt', 'note.mp3', 'cdef', 'zzz', '.pdf']
+    for needle in needles:
+        for file_type in ('file', 'folder'):
+            assert search.find(roots, needle, file_type) == walk_find(roots, needle, file_type), (needle, file_type)
+
+
+def test_expired_deadline_raises_timeout(tmp_path):
+    random_tree(str(tmp_path), 0)
+    with pytest.raises(SearchTimeout):
+        ParallelSearch().find([str(tmp_path)], 'zzz', deadline=time.monotonic() - 1)
+
+
+def test_cancelled_search_raises(tmp_path):
+    random_tree(str(tmp_path), 0)
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(SearchCancelled):
+        ParallelSearch().find([str(tmp_path)], 'zzz', cancel=token)
+
+
+def test_timeout_is_a_kind_of_cancellation():
+    assert issubclass(SearchTimeout, SearchCancelled)
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+import pytest
+
+from file_index import FileIndex
+from file_watcher import FileWatcher
+from test_file_index import make_tree
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def index(tmp_path):
+    make_tree(str(tmp_path / 'home'), ['Documents/', 'Videos/'])
+    make_tree(str(tmp_path / 'disk'), ['opt/'])
+    index = FileIndex(str(tmp_path / 'index.db'))
+    index.rebuild([str(tmp_path / 'home' / 'Documents'), str(tmp_path)])
+    return index
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify is Linux-only")
+def test_watched_roots_update_at_once_and_the_rest_on_the_sweep(index, tmp_path):
+    home = tmp_path / 'home'
+    watcher = FileWatcher(index, roots=[str(home / 'Documents'), str(home / 'Videos')],
+                          batch_window=0.05, sweep_interval=1)
+    assert watcher.start() == 'inotify'
+    try:
+        make_tree(str(home), ['Videos/holiday.mp4'])
+        make_tree(str(tmp_path / 'disk'), ['opt/new.txt'])
+        assert wait_for(lambda: index.find('holiday.mp4') is not None, timeout=1)
+        assert index.find('new.txt') is None
+        assert wait_for(lambda: index.find('new.txt') is not None)
+    finally:
+        watcher.stop()
+
+
+def test_touch_rescans_in_the_background(index, tmp_path):
+    watcher = FileWatcher(index, roots=[])
+    try:
+        make_tree(str(tmp_path / 'home'), ['Documents/copied.pdf'])
+        watcher.touch([str(tmp_path / 'home' / 'Documents')])
+        assert wait_for(lambda: index.find('copied.pdf') is not None)
+    finally:
+        watcher.stop()
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from assistant_engine import Base, CommandHistory, IntentFeedback
+from history_writer import HistoryWriter
+
+HISTORY, FEEDBACK = CommandHistory.__table__, IntentFeedback.__table__
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def rows(db, table):
+    with db.connect() as connection:
+        return connection.execute(select(table).order_by(table.c.id)).fetchall()
+
+
+def test_flush_writes_everything_logged_before_it(db):
+    writer = HistoryWriter(db, HISTORY, FEEDBACK, interval=60)
+    writer.start()
+    for i in range(5):
+        writer.log(f"command {i}", 'open_file', user_id=1)
+    assert writer.flush(timeout=5)
+    assert [row.command_text for row in rows(db, HISTORY)] == [f"command {i}" for i in range(5)]
+    assert writer.stats['batches'] == 1
+    writer.stop()
+
+
+def test_batches_are_capped(db):
+    writer = HistoryWriter(db, HISTORY, FEEDBACK, batch_size=4, interval=60)
+    for i in range(10):
+        writer.log(f"command {i}", 'play_music', user_id=1)
+    writer.start()
+    writer.flush(timeout=5)
+    assert len(rows(db, HISTORY)) == 10
+    assert writer.stats['largest_batch'] == 4
+    writer.stop()
+
+
+def test_stop_drains_the_queue(db):
+    writer = HistoryWriter(db, HISTORY, FEEDBACK, interval=60)
+    writer.start()
+    writer.log("play music", 'play_music', user_id=2)
+    writer.stop()
+    [row] = rows(db, HISTORY)
+    assert (row.command_text, row.intent, row.user_id) == ("play music", 'play_music', 2)
+
+
+def test_flush_without_a_thread_returns_at_once(db):
+    assert HistoryWriter(db, HISTORY, FEEDBACK).flush(timeout=5) is False
+
+
+def test_confirmed_rows_get_feedback_in_order(db):
+    called = threading.Event()
+    writer = HistoryWriter(db, HISTORY, FEEDBACK, interval=60, on_feedback=called.set)
+    writer.start()
+    writer.log("open thing", 'open_file', user_id=1)
+    writer.log("blah", 'search_file', user_id=1, confirmed=True)
+    writer.log("play music", 'play_music', user_id=1)
+    writer.flush(timeout=5)
+    history = rows(db, HISTORY)
+    assert [row.command_text for row in history] == ["open thing", "blah", "play music"]
+    [feedback] = rows(db, FEEDBACK)
+    assert (feedback.history_id, feedback.intent) == (history[1].id, 'search_file')
+    assert called.is_set()
+    writer.stop()
+
+
+def test_failed_write_is_counted_and_reported(db, capsys):
+    writer = HistoryWriter(db, HISTORY, FEEDBACK, interval=60)
+    writer.start()
+    HISTORY.drop(db)
+    writer.log("open notes.txt", 'open_file', user_id=1)
+    writer.flush(timeout=5)
+    assert writer.stats['errors'] == 1
+    captured = capsys.readouterr()
+    assert "Couldn't write command history" in captured.err
+    assert captured.out == ''
+    writer.stop()
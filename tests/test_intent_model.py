@@ -0,0 +1,65 @@
+import os
+import csv
+import pickle
+
+import numpy as np
+import pytest
+
+from intent_model import COMPACT_MODEL_PATH, CompactIntentModel, export_compact
+
+sklearn = pytest.importorskip('sklearn')
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS = [
+    'open folder documents', 'play some music', 'play a movie tonight', 'delete notes txt',
+    'delete report permanently', 'copy photo jpg to backup', 'move invoice pdf to desktop',
+    'search for budget xlsx', 'open the file notes', 'find my music', 'zzz unknown words',
+]
+LABELS = ['open_folder', 'play_music', 'play_movie', 'delete_file', 'delete_forever', 'copy_file',
+          'move_file', 'search_file', 'open_file', 'search_file', 'open_file']
+
+
+def test_shipped_compact_model_matches_the_pickle():
+    from preprocessing import preprocess_text
+    with open(os.path.join(ROOT, 'file_assistant_model.pkl'), 'rb') as f:
+        pipeline = pickle.load(f)
+    with open(os.path.join(ROOT, 'commands.csv'), newline='', encoding='utf-8') as f:
+        commands = [preprocess_text(row['Command']) for row in csv.DictReader(f) if row['Command']]
+    compact = CompactIntentModel(COMPACT_MODEL_PATH)
+    assert list(compact.classes_) == [str(c) for c in pipeline.classes_]
+    np.testing.assert_allclose(compact.predict_proba(commands), pipeline.predict_proba(commands), atol=1e-9)
+
+
+@pytest.mark.parametrize('vectorizer, classifier', [
+    (dict(ngram_range=(1, 2), stop_words='english'), dict()),
+    (dict(ngram_range=(1, 1), sublinear_tf=True), dict()),
+    (dict(ngram_range=(2, 3), binary=True, norm='l1'), dict()),
+    (dict(norm=None, lowercase=False), dict(C=10)),
+])
+def test_exported_pipeline_matches_sklearn(tmp_path, vectorizer, classifier):
+    pipeline = make_pipeline(TfidfVectorizer(**vectorizer), LogisticRegression(max_iter=1000, **classifier))
+    pipeline.fit(COMMANDS, LABELS)
+    export_compact(pipeline, str(tmp_path / 'model'))
+    compact = CompactIntentModel(str(tmp_path / 'model'))
+    queries = COMMANDS + ['Play MUSIC please', 'nothing in the vocabulary', '']
+    np.testing.assert_allclose(compact.predict_proba(queries), pipeline.predict_proba(queries), atol=1e-9)
+    assert list(compact.predict(queries)) == list(pipeline.predict(queries))
+
+
+def test_binary_classifier_matches_sklearn(tmp_path):
+    pipeline = make_pipeline(TfidfVectorizer(), LogisticRegression())
+    pipeline.fit(COMMANDS[:4], ['open', 'play', 'play', 'open'])
+    export_compact(pipeline, str(tmp_path / 'model'))
+    compact = CompactIntentModel(str(tmp_path / 'model'))
+    np.testing.assert_allclose(compact.predict_proba(COMMANDS), pipeline.predict_proba(COMMANDS), atol=1e-9)
+
+
+def test_export_refuses_custom_tokenizers(tmp_path):
+    pipeline = make_pipeline(TfidfVectorizer(tokenizer=str.split, token_pattern=None), LogisticRegression())
+    pipeline.fit(COMMANDS, LABELS)
+    with pytest.raises(ValueError):
+        export_compact(pipeline, str(tmp_path / 'model'))
+    assert not CompactIntentModel.exists(str(tmp_path / 'model'))
@@ -0,0 +1,53 @@
+import os
+import threading
+
+import pytest
+
+import media_catalog
+from file_index import FileIndex
+from media_catalog import MediaCatalog
+from test_file_index import make_tree
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    home = str(tmp_path / 'home')
+    make_tree(home, ['Music/old.mp3', 'Music/new.mp3'])
+    os.utime(os.path.join(home, 'Music', 'old.mp3'), (1, 1))
+    index = FileIndex(str(tmp_path / 'index.db'))
+    index.rebuild([home])
+    return MediaCatalog(index), home
+
+
+def wait_for_load(catalog):
+    for _ in range(100):
+        if catalog._generation == catalog.file_index.generation:
+            return True
+        threading.Event().wait(0.05)
+    return False
+
+
+def test_strategies(catalog):
+    catalog, home = catalog
+    music = os.path.join(home, 'Music')
+    assert catalog.pick('music', 'most_recent') == os.path.join(music, 'new.mp3')
+    first = catalog.pick('music', 'least_recently_played')
+    catalog.mark_played(first)
+    assert catalog.pick('music', 'least_recently_played') != first
+    assert catalog.pick('video') is None
+    with pytest.raises(ValueError):
+        catalog.pick('music', 'loudest')
+
+
+def test_index_changes_reload_in_the_background(catalog, monkeypatch):
+    catalog, home = catalog
+    music = os.path.join(home, 'Music')
+    assert catalog.pick('music', 'most_recent') == os.path.join(music, 'new.mp3')
+    monkeypatch.setattr(media_catalog, 'RELOAD_INTERVAL', 0)
+    os.remove(os.path.join(music, 'new.mp3'))
+    make_tree(home, ['Music/newest.mp3'])
+    catalog.file_index.refresh_dirs([music])
+    # Until the reload lands the old partitions answer, skipping the file that has gone
+    assert catalog.pick('music', 'most_recent') in (os.path.join(music, 'old.mp3'), os.path.join(music, 'newest.mp3'))
+    assert wait_for_load(catalog)
+    assert catalog.pick('music', 'most_recent') == os.path.join(music, 'newest.mp3')
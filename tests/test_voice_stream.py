@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from file_search import CancelToken, SearchCancelled
+from voice_stream import EnergyVAD, UtteranceSegmenter, StreamingTranscriber, frame_rms
+
+FRAME = 480  # samples in a 30 ms frame at 16 kHz
+SPEECH = (np.full(FRAME, 3000, dtype=np.int16)).tobytes()
+SILENCE = np.zeros(FRAME, dtype=np.int16).tobytes()
+
+
+def segmenter(**kwargs):
+    return UtteranceSegmenter(EnergyVAD(300), **kwargs)
+
+
+def feed(segmenter, frames):
+    return [segmenter.feed(frame) for frame in frames]
+
+
+def test_frame_rms():
+    assert frame_rms(SPEECH) == pytest.approx(3000)
+    assert frame_rms(SILENCE) == 0
+    assert frame_rms(b'') == 0
+
+
+def test_leading_silence_is_trimmed_to_the_pre_roll():
+    s = segmenter()
+    assert feed(s, [SILENCE] * 50) == [None] * 50
+    assert not s.started
+    s.feed(SPEECH)
+    assert s.started
+    assert len(s.frames) == s.pre_roll + 1
+
+
+def test_short_pause_closes_a_chunk_once():
+    s = segmenter()
+    events = feed(s, [SPEECH] * 10 + [SILENCE] * s.chunk_pause + [SILENCE] * 3)
+    assert events.count('chunk') == 1
+    assert events[10 + s.chunk_pause - 1] == 'chunk'
+    assert 'end' not in events
+
+
+def test_long_pause_ends_the_utterance():
+    s = segmenter()
+    events = feed(s, [SPEECH] * 10 + [SILENCE] * s.end_pause)
+    assert events[-1] == 'end'
+
+
+def test_speech_after_a_chunk_opens_a_new_one():
+    s = segmenter()
+    events = feed(s, ([SPEECH] * 5 + [SILENCE] * s.chunk_pause) * 2)
+    assert events.count('chunk') == 2
+
+
+def test_length_cap_ends_the_utterance():
+    s = segmenter(max_seconds=1)
+    events = feed(s, [SPEECH] * s.max_frames)
+    assert events[-1] == 'end'
+    assert events[:-1] == [None] * (s.max_frames - 1)
+
+
+def test_audio_drops_trailing_silence():
+    s = segmenter()
+    feed(s, [SPEECH] * 10 + [SILENCE] * 5)
+    audio = s.audio()
+    assert audio.dtype == np.float32
+    assert len(audio) == 10 * FRAME
+    assert audio[0] == pytest.approx(3000 / 32768)
+
+
+def test_transcriber_reuses_the_last_partial():
+    calls = []
+
+    def transcribe(audio):
+        calls.append(len(audio))
+        return f"{len(audio)} samples"
+
+    s = segmenter()
+    frames = iter([SILENCE] * 3 + [SPEECH] * 10 + [SILENCE] * s.end_pause)
+    partials = []
+    text = StreamingTranscriber(transcribe, s, partials.append).run(lambda: next(frames))
+    assert text == f"{10 * FRAME + 3 * FRAME} samples"
+    assert calls == [13 * FRAME]
+    assert partials == [text]
+
+
+def test_transcriber_decodes_again_when_speech_continued():
+    calls = []
+
+    def transcribe(audio):
+        calls.append(len(audio))
+        return "partial" if len(calls) == 1 else "final"
+
+    # The length cap ends the utterance mid-speech, after the only chunk boundary
+    s = segmenter(max_seconds=1)
+    frames = iter([SPEECH] * 5 + [SILENCE] * s.chunk_pause + [SPEECH] * (s.max_frames - 5 - s.chunk_pause))
+    transcriber = StreamingTranscriber(transcribe, s)
+    assert transcriber.run(lambda: next(frames)) == "final"
+    assert len(calls) == 2
+    assert not transcriber.stats['reused_partial']
+
+
+def test_transcriber_times_out_without_speech():
+    with pytest.raises(TimeoutError):
+        StreamingTranscriber(lambda audio: '', segmenter()).run(lambda: SILENCE, timeout=0)
+
+
+def test_transcriber_stops_when_cancelled():
+    # Cancelled mid-utterance: no more frames are read and nothing is transcribed
+    cancel = CancelToken()
+    read = []
+
+    def read_frame():
+        read.append(1)
+        if len(read) == 5:
+            cancel.cancel()
+        return SPEECH
+
+    transcriber = StreamingTranscriber(lambda audio: pytest.fail('transcribed'), segmenter())
+    with pytest.raises(SearchCancelled):
+        transcriber.run(read_frame, cancel=cancel)
+    assert len(read) == 5
@@ -1,72 +1,120 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+
 import pandas as pd
+from joblib import Memory
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
 from sklearn.pipeline import make_pipeline
-from sklearn.metrics import classification_report, confusion_matrix
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import nltk
 import pickle
-
-# Download NLTK resources
-nltk.download('punkt')
-nltk.download('wordnet')
-
-# Preprocessing: Lemmatization
-lemmatizer = WordNetLemmatizer()
-
-def preprocess_text(text):
-    words = word_tokenize(text.lower())  # Tokenize and convert to lower case
-    lemmatized_words = [lemmatizer.lemmatize(word) for word in words if word.isalpha()]  # Lemmatize and remove non-alphabetical tokens
-    return ' '.join(lemmatized_words)
-
-# Load the dataset
-df = pd.read_csv('commands.csv')
-
-# Apply preprocessing to the command column
-df['Command'] = df['Command'].apply(preprocess_text)
-
-# Features and labels
-X = df['Command']
-y = df['Intent']
-
-# Split data into train and test sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Create a TF-IDF Vectorizer with bigrams and a limited number of features
-vectorizer = TfidfVectorizer(stop_words='english', max_features=1000, ngram_range=(1, 2))
-
-# Create a model pipeline
-model = make_pipeline(vectorizer, LogisticRegression(max_iter=1000))
-
-# Use StratifiedKFold to prevent imbalance errors during cross-validation
-cv = StratifiedKFold(n_splits=2)
-
-# Perform hyperparameter tuning for the logistic regression model
-param_grid = {'logisticregression__C': [0.001, 0.01, 0.1, 1, 10, 100]}
-grid_search = GridSearchCV(model, param_grid, cv=cv, n_jobs=-1)
-grid_search.fit(X_train, y_train)
-
-# Print best hyperparameters found by GridSearchCV
-print(f"Best hyperparameters: {grid_search.best_params_}")
-print(f"Best cross-validation score: {grid_search.best_score_}")
-
-# Train the model with the best found parameters
-best_model = grid_search.best_estimator_
-
-# Evaluate the model on the test set
-y_pred = best_model.predict(X_test)
-
-# Print classification report and confusion matrix
-print("Classification Report:")
-print(classification_report(y_test, y_pred))
-print("Confusion Matrix:")
-print(confusion_matrix(y_test, y_pred))
-
-# Save the trained model
-with open('file_assistant_model.pkl', 'wb') as f:
-    pickle.dump(best_model, f)
-    
-
-print("✅ Model trained and saved successfully.")
+from intent_model import export_compact
+from preprocessing import preprocess_text  # the assistant applies the same preprocessing before classifying
+
+SEED = 42
+
+# Searched jointly; every (fold, n-gram range) vectorizer is fitted once and cached, then
+# reused by all the C / class_weight candidates that share it
+PARAM_GRID = {
+    'tfidfvectorizer__ngram_range': [(1, 1), (1, 2), (1, 3)],
+    'logisticregression__C': [0.01, 0.1, 1, 10, 100],
+    'logisticregression__class_weight': [None, 'balanced'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the intent classifier")
+    parser.add_argument('--dataset', default='commands.csv')
+    parser.add_argument('--model', default='file_assistant_model.pkl',
+                        help="pickle path; the compact model and metrics report are written next to it")
+    parser.add_argument('--cache-dir', default='.train_cache', help="fitted fold vectorizers, reused across runs")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=-1, help="grid search workers, -1 for all cores")
+    args = parser.parse_args()
+
+    # Download NLTK resources
+    nltk.download('wordnet')
+
+    # Load the dataset
+    df = pd.read_csv(args.dataset).dropna()
+
+    # Apply preprocessing to the command column
+    df['Command'] = df['Command'].apply(preprocess_text)
+
+    # Features and labels
+    X = df['Command']
+    y = df['Intent']
+
+    # Split data into train and test sets
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=SEED, stratify=y)
+
+    # TF-IDF features into logistic regression; the vectorizer step is cached on disk
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=1000, ngram_range=(1, 2))
+    model = make_pipeline(vectorizer, LogisticRegression(max_iter=1000, random_state=SEED),
+                          memory=Memory(args.cache_dir, verbose=0))
+
+    # Shuffled stratified folds with a fixed seed, so reruns pick the same model
+    cv = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=SEED)
+
+    # Hyperparameter search across all cores
+    grid_search = GridSearchCV(model, PARAM_GRID, cv=cv, n_jobs=args.jobs)
+    started = time.perf_counter()
+    grid_search.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+
+    # Print best hyperparameters found by GridSearchCV
+    print(f"Best hyperparameters: {grid_search.best_params_}")
+    print(f"Best cross-validation score: {grid_search.best_score_}")
+    print(f"Grid search time: {fit_seconds:.1f}s for {len(grid_search.cv_results_['params'])} candidates")
+
+    # Train the model with the best found parameters
+    best_model = grid_search.best_estimator_
+    best_model.set_params(memory=None)
+
+    # Evaluate the model on the test set
+    y_pred = best_model.predict(X_test)
+
+    # Print classification report and confusion matrix
+    print("Classification Report:")
+    print(classification_report(y_test, y_pred, zero_division=0))
+    print("Confusion Matrix:")
+    print(confusion_matrix(y_test, y_pred))
+
+    # Save the trained model
+    with open(args.model, 'wb') as f:
+        pickle.dump(best_model, f)
+
+    # Export the NumPy-only artifact the assistant loads at startup
+    base = os.path.splitext(args.model)[0]
+    export_compact(best_model, base)
+
+    # Metrics report next to the model
+    report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+    metrics = {
+        'trained_at': datetime.now().isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'train_size': len(X_train),
+        'test_size': len(X_test),
+        'best_params': {name: list(value) if isinstance(value, tuple) else value
+                        for name, value in grid_search.best_params_.items()},
+        'cv_folds': args.folds,
+        'cv_accuracy': grid_search.best_score_,
+        'test_accuracy': accuracy_score(y_test, y_pred),
+        'f1_per_intent': {intent: report[intent]['f1-score'] for intent in best_model.classes_},
+        'macro_f1': report['macro avg']['f1-score'],
+        'grid_search_seconds': fit_seconds,
+        'refit_seconds': grid_search.refit_time_,
+    }
+    with open(base + '.metrics.json', 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+    print("✅ Model trained and saved successfully.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import wave
+import queue
+import hashlib
+import threading
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+
+URGENT, NORMAL, LOW = 0, 1, 2
+TTS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')
+CACHE_AFTER = 2  # a phrase spoken this many times gets rendered to a WAV for next time
+CACHE_LIMIT = 64  # rendered WAVs kept besides the prerendered phrases, least recently played dropped first
+SPOKEN_LIMIT = 512  # distinct phrases whose repeat count is tracked
+
+
+class TTSWorker:
+    # pyttsx3 engines belong to the thread that created them, so one daemon thread owns the
+    # engine and speaks from a priority queue; callers never block. interrupt() makes every
+    # queued utterance stale and cuts off the one being spoken. Phrases that keep coming
+    # back are rendered once and then played straight from the WAV.
+    def __init__(self, rate=150, volume=1.0, cache_dir=TTS_CACHE_DIR, cache_after=CACHE_AFTER,
+                 cache_limit=CACHE_LIMIT):
+        self.rate = rate
+        self.volume = volume
+        self.cache_dir = cache_dir
+        self.cache_after = cache_after
+        self.cache_limit = cache_limit
+        self.available = True
+        self.queue = queue.PriorityQueue()
+        self.generation = 0
+        self.spoken = OrderedDict()
+        self.pinned = set()
+        self.to_render = []
+        self._sequence = itertools.count()
+        self._current = None
+        self._engine = None
+        self._sounddevice = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def say(self, text, priority=NORMAL):
+        # Returns an Event set once the text has been spoken, skipped as stale, or found unspeakable
+        done = threading.Event()
+        self.queue.put((priority, next(self._sequence), self.generation, text, done))
+        return done
+
+    def prerender(self, phrases):
+        # Queued behind everything else; rendered whenever the worker is otherwise idle and
+        # never pruned from the cache
+        self.pinned.update(phrases)
+        self.queue.put((LOW + 1, next(self._sequence), None, list(phrases), None))
+
+    def interrupt(self):
+        self.generation += 1
+
+    def stop(self):
+        self.interrupt()
+        self.queue.put((-1, next(self._sequence), None, None, None))
+
+    def _stale(self, generation):
+        return generation is not None and generation < self.generation
+
+    def _run(self):
+        try:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            self._engine.setProperty('rate', self.rate)
+            self._engine.setProperty('volume', self.volume)
+            self._engine.connect('started-word', self._on_word)
+        except Exception as e:
+            # Keep draining the queue so nobody waits on an utterance that will never be spoken
+            print(f"Text-to-speech unavailable: {e}", file=sys.stderr)
+            self.available = False
+            self._engine = None
+        if self._engine is not None:
+            try:
+                import sounddevice
+                self._sounddevice = sounddevice
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except (ImportError, OSError):
+                self._sounddevice = None
+
+        while True:
+            priority, _, generation, item, done = self.queue.get()
+            if priority < 0:
+                return
+            try:
+                if self._engine is None:
+                    pass
+                elif generation is None:
+                    self.to_render.extend(item)
+                elif not self._stale(generation):
+                    self._current = generation
+                    self._speak(item)
+                    self._current = None
+            finally:
+                if done is not None:
+                    done.set()
+            if self._engine is not None and self.queue.empty():
+                self._render_pending()
+
+    def _speak(self, text):
+        path = self._cache_path(text)
+        if path and os.path.exists(path) and self._play(path):
+            return
+        self._engine.say(text)
+        self._engine.runAndWait()
+        count = self.spoken[text] = self.spoken.get(text, 0) + 1
+        self.spoken.move_to_end(text)
+        if len(self.spoken) > SPOKEN_LIMIT:
+            self.spoken.popitem(last=False)
+        if path and count == self.cache_after:
+            self.to_render.append(text)
+
+    def _on_word(self, name, location, length):
+        # pyttsx3 only honours stop() from inside its own callbacks
+        if self._stale(self._current):
+            self._engine.stop()
+
+    def _cache_path(self, text):
+        if self._sounddevice is None:
+            return None
+        key = hashlib.sha1(f"{self.rate}|{self.volume}|{text}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, key + '.wav')
+
+    def _render_pending(self):
+        rendered = False
+        while self.to_render and self.queue.empty():
+            text = self.to_render.pop()
+            path = self._cache_path(text)
+            if path is None or os.path.exists(path):
+                continue
+            temp = path + '.tmp.wav'
+            self._engine.save_to_file(text, temp)
+            self._engine.runAndWait()
+            if os.path.exists(temp):
+                os.replace(temp, path)
+                rendered = True
+        if rendered:
+            self._prune_cache()
+
+    def _prune_cache(self):
+        # mtime doubles as last-played time (_play touches the file), so the oldest go first
+        pinned = {self._cache_path(text) for text in self.pinned}
+        try:
+            with os.scandir(self.cache_dir) as it:
+                files = [(entry.stat().st_mtime, entry.path) for entry in it
+                         if entry.name.endswith('.wav') and entry.path not in pinned]
+        except OSError:
+            return
+        files.sort()
+        for _, path in files[:max(0, len(files) - self.cache_limit)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _play(self, path):
+        try:
+            with wave.open(path, 'rb') as f:
+                channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+                raw = f.readframes(f.getnframes())
+        except (OSError, EOFError, wave.Error):
+            return False
+        if width != 2:
+            return False
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        audio = np.frombuffer(raw, dtype=np.int16).reshape(-1, channels)
+        generation = self._current
+        self._sounddevice.play(audio, rate)
+        while self._sounddevice.get_stream().active:
+            if self._stale(generation):
+                self._sounddevice.stop()
+                break
+            time.sleep(0.02)
+        return True
@@ -0,0 +1,78 @@
+import sys
+import time
+import queue
+import threading
+
+UI_TICK_MS = 16  # roughly one frame
+UI_BUDGET_MS = 8  # time per tick the Tk thread may spend on posted work
+
+
+class UIDispatcher:
+    # Worker threads post callables; the Tk thread runs them from a root.after tick. Ordered
+    # events (chat messages) are drained within a time budget and the rest wait for the next
+    # tick, so a burst never stalls the main loop. Coalesced events (status text) keep only
+    # the latest call per key, so ten status flips between two ticks cost one repaint.
+    def __init__(self, after, tick_ms=UI_TICK_MS, budget_ms=UI_BUDGET_MS):
+        self.after = after
+        self.tick_ms = tick_ms
+        self.budget = budget_ms / 1000
+        self.events = queue.Queue()
+        self.latest = {}
+        self.hooks = []
+        self._lock = threading.Lock()
+        self.stats = {'ticks': 0, 'events': 0, 'coalesced': 0, 'max_tick_ms': 0.0}
+
+    def post(self, func, *args, **kwargs):
+        self.events.put((func, args, kwargs))
+
+    def post_modal(self, func, *args, **kwargs):
+        # For calls that run a nested event loop (dialogs): they get a root.after callback of
+        # their own instead of running inside drain(), so ticks keep coming while they are open
+        self.post(self.after, 0, lambda: self._call(func, args, kwargs))
+
+    def post_latest(self, key, func, *args, **kwargs):
+        with self._lock:
+            if key in self.latest:
+                self.stats['coalesced'] += 1
+            self.latest[key] = (func, args, kwargs)
+
+    def add_hook(self, func):
+        # Called once per tick on the Tk thread, e.g. to collect finished jobs
+        self.hooks.append(func)
+
+    def start(self):
+        self.after(self.tick_ms, self._tick)
+
+    def _tick(self):
+        # The next tick is scheduled first, so nothing run by drain() can hold it back
+        self.after(self.tick_ms, self._tick)
+        self.drain()
+
+    def drain(self):
+        started = time.perf_counter()
+        with self._lock:
+            latest, self.latest = self.latest, {}
+        for func, args, kwargs in latest.values():
+            self._call(func, args, kwargs)
+        while time.perf_counter() - started < self.budget:
+            try:
+                func, args, kwargs = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self._call(func, args, kwargs)
+        for hook in self.hooks:
+            self._call(hook, (), {})
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stats['ticks'] += 1
+        self.stats['max_tick_ms'] = max(self.stats['max_tick_ms'], elapsed)
+        return elapsed
+
+    def pending(self):
+        return self.events.qsize() + len(self.latest)
+
+    def _call(self, func, args, kwargs):
+        self.stats['events'] += 1
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            print(f"UI update failed: {e}", file=sys.stderr)
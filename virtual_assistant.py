@@ -1,213 +1,166 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, filedialog
 import speech_recognition as sr
-import os
-import shutil
-import pickle
-import fnmatch
-import subprocess
-import pyttsx3
-import re
-import whisper
+import numpy as np
 import threading
-from datetime import datetime
+import time
+import functools
 from tkinter.font import Font
-import send2trash
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
-
-# ================== Database Setup ==================
-Base = declarative_base()
-
-class User(Base):
-    __tablename__ = 'users'
-    id = Column(Integer, primary_key=True)
-    username = Column(String(50), unique=True)
-    commands = relationship('CommandHistory', back_populates='user')
-
-class CommandHistory(Base):
-    __tablename__ = 'command_history'
-    id = Column(Integer, primary_key=True)
-    command_text = Column(Text)
-    intent = Column(String(50))
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    user_id = Column(Integer, ForeignKey('users.id'))
-    user = relationship('User', back_populates='commands')
-
-# ================== Core Functionality ==================
-class DatabaseManager:
-    def __init__(self, db_url='sqlite:///assistant.db'):
-        self.engine = create_engine(db_url)
-        Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
-    
-    def get_session(self):
-        return self.Session()
-
-class FileManager:
-    @staticmethod
-    def find_file_or_folder(name, file_type='file'):
-        # 1. Check system folders first
-        system_folders = {
-            'music': os.path.join(os.path.expanduser('~'), 'Music'),
-            'documents': os.path.join(os.path.expanduser('~'), 'Documents'),
-            'downloads': os.path.join(os.path.expanduser('~'), 'Downloads'),
-            'desktop': os.path.join(os.path.expanduser('~'), 'Desktop'),
-            'pictures': os.path.join(os.path.expanduser('~'), 'Pictures'),
-            'videos': os.path.join(os.path.expanduser('~'), 'Videos')
-        }
-
-        if name.lower() in system_folders:
-            path = system_folders[name.lower()]
-            if os.path.exists(path):
-                return path
-
-        # 2. Priority search paths
-        search_paths = [
-            os.path.join(os.path.expanduser('~'), 'Desktop'),
-            os.path.join(os.path.expanduser('~'), 'Documents'),
-            os.path.join(os.path.expanduser('~'), 'Downloads'),
-            os.path.join(os.path.expanduser('~'), 'Music'),
-            'D:\\Desktop\\backup as\\music',  # Custom music path
-            'D:\\',  # Direct D drive access
-            'C:\\Users\\'  # Windows user directory
-        ]
-
-        # 3. Search priority locations
-        for path in search_paths:
-            if os.path.exists(path):
-                for root, dirs, files in os.walk(path):
-                    try:
-                        if file_type == 'file':
-                            for file in files:
-                                if fnmatch.fnmatch(file.lower(), f"*{name.lower()}*"):
-                                    return os.path.join(root, file)
-                        elif file_type == 'folder':
-                            for folder in dirs:
-                                if fnmatch.fnmatch(folder.lower(), f"*{name.lower()}*"):
-                                    return os.path.join(root, folder)
-                    except PermissionError:
-                        continue
-                    except Exception:
-                        continue
-
-        # 4. Full system search fallback
-        drives = ['C:\\', 'D:\\', 'E:\\'] if os.name == 'nt' else ['/']
-        for drive in drives:
-            for root, dirs, files in os.walk(drive):
-                try:
-                    if file_type == 'file':
-                        for file in files:
-                            if fnmatch.fnmatch(file.lower(), f"*{name.lower()}*"):
-                                return os.path.join(root, file)
-                    elif file_type == 'folder':
-                        for folder in dirs:
-                            if fnmatch.fnmatch(folder.lower(), f"*{name.lower()}*"):
-                                return os.path.join(root, folder)
-                except PermissionError:
-                    continue
-                except Exception:
-                    continue
-        return None
-
-    @staticmethod
-    def open_path(path):
-        if os.path.exists(path):
-            if os.name == 'nt':
-                os.startfile(path)
-            else:
-                subprocess.call(('xdg-open', path))
-            return True
-        return False
-
-    @staticmethod
-    def copy_file(source, destination):
-        try:
-            shutil.copy(source, destination)
-            return True, f"Copied to {destination}"
-        except Exception as e:
-            return False, f"Couldn't copy: {e}"
+from asr_backends import SAMPLE_RATE, create_backend, load_wav
+from voice_stream import FRAME_MS, EnergyVAD, UtteranceSegmenter, StreamingTranscriber
+from command_engine import CommandEngine
+from file_search import SearchCancelled
+from tts_worker import TTSWorker, NORMAL
+from chat_view import ChatTranscript
+from ui_dispatch import UIDispatcher
+# The headless engine (and, for older imports, its database and processor classes)
+from assistant_engine import (AssistantEngine, CommandProcessor, DatabaseManager, FileManager,
+                              User, CommandHistory, IntentFeedback)
+
+# ================== Speech ==================
+# See asr_backends.BACKENDS: whisper-tiny/base/small, vosk, pocketsphinx. On CPU-only hosts the
+# whisper-*-int8 variants quantize the model and skip 30 s padding for short commands.
+ASR_BACKEND = 'whisper-base'
+STREAM_CHUNK = SAMPLE_RATE * FRAME_MS // 1000  # samples per VAD frame
+STREAMING_VOICE = True  # VAD-segmented incremental transcription instead of listen-then-transcribe
+GREETING = "Hi, I'm Zuri, your virtual assistant. How can I help you?"
+LISTENING_PROMPT = "I'm listening..."
+PRERENDERED_PHRASES = (GREETING, LISTENING_PROMPT)  # played from cached audio after the first run
+PROMPT_WAIT = 5  # longest the microphone waits for the listening prompt to finish, in seconds
 
-    @staticmethod
-    def move_file(source, destination):
-        try:
-            shutil.move(source, destination)
-            return True, f"Moved to {destination}"
-        except Exception as e:
-            return False, f"Couldn't move: {e}"
-
-    @staticmethod
-    def delete_file(path, permanent=False):
-        try:
-            if permanent:
-                os.remove(path)
-                return True, "Permanently deleted"
-            send2trash.send2trash(path)
-            return True, "Sent to Recycle Bin"
-        except Exception as e:
-            return False, f"Deletion failed: {e}"
 
 class SpeechManager:
-    def __init__(self):
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)
-        self.engine.setProperty('volume', 1)
+    def __init__(self, backend=ASR_BACKEND):
+        # Speech runs on its own thread so replies never block the GUI
+        self.tts = TTSWorker(rate=150, volume=1.0)
+        self.tts.start()
+        self.tts.prerender(PRERENDERED_PHRASES)
         self.recognizer = sr.Recognizer()
-        self.whisper_model = whisper.load_model("base")
-
-    def speak(self, text):
-        self.engine.say(text)
-        self.engine.runAndWait()
-
-    def transcribe_audio(self, audio_path):
-        return self.whisper_model.transcribe(audio_path)
-
-class CommandProcessor:
-    def __init__(self):
-        with open('file_assistant_model.pkl', 'rb') as f:
-            self.model = pickle.load(f)
-        self.extensions = ['mp3', 'mp4', 'pdf', 'docx', 'txt', 'png', 'jpg', 'jpeg','pptx','doc','json','csv','xlsx']
-
-    def extract_filename(self, command):
-        command = command.lower()
-        for word in ['open', 'play', 'delete', 'permanently', 'search', 'file', 'folder', 'move', 'copy']:
-            command = command.replace(word, '')
-        # Enhanced regex pattern
-        pattern = r'([\w\s_\-\(\)\[\]\!@#\$%\^&]+?)\s*\.(' + '|'.join(self.extensions) + r')'
-        match = re.search(pattern, command)
-        if match:
-            name, ext = match.groups()
-            return f"{name.strip()}.{ext}"
-        return None
-
-    def extract_folder_name(self, command):
-        command = command.lower()
-        patterns = [
-            r'open (?:folder|directory) (.+?)(?: please|$|\?)',
-            r'(?:show|display) (.+?) folder',
-            r'access my (.+?) directory'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, command)
-            if match:
-                return match.group(1).strip()
-        return None
-
-    def classify_intent(self, command):
+        self.backend = create_backend(backend)
+        self.model_error = None
+        self._model_ready = threading.Event()
+        self._loader = None
+        self._loader_lock = threading.Lock()
+        self.last_stream_stats = {}
+
+    def load_model_async(self, on_done=None):
+        # Loading a model (and for Whisper, importing torch) happens off the startup path
+        with self._loader_lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load_model, args=(on_done,), daemon=True)
+                self._loader.start()
+
+    def _load_model(self, on_done):
         try:
-            return self.model.predict([command])[0]
+            self.backend.load()
         except Exception as e:
-            raise RuntimeError(f"Classification error: {str(e)}")
+            self.model_error = e
+        finally:
+            self._model_ready.set()
+            if on_done:
+                on_done(self.model_error)
+
+    @property
+    def model_ready(self):
+        return self._model_ready.is_set() and self.model_error is None
+
+    def wait_for_model(self, timeout=None, cancel=None):
+        self.load_model_async()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self._model_ready.wait(0.1):
+            if cancel is not None and cancel.cancelled:
+                raise SearchCancelled()
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("Speech model is still loading")
+        if self.model_error is not None:
+            raise RuntimeError(f"Speech model failed to load: {self.model_error}")
+        return self.backend
+
+    def speak(self, text, priority=NORMAL):
+        # Returns an Event set once the text has been spoken (or dropped)
+        return self.tts.say(text, priority)
+
+    def interrupt(self):
+        # Drops queued replies and cuts off the one being spoken
+        self.tts.interrupt()
+
+    def listen_streaming(self, source, on_partial=None, timeout=15, cancel=None):
+        # The ambient-noise calibration doubles as the VAD threshold
+        segmenter = UtteranceSegmenter(EnergyVAD(self.recognizer.energy_threshold),
+                                       sample_rate=source.SAMPLE_RATE,
+                                       frame_ms=source.CHUNK * 1000 // source.SAMPLE_RATE)
+        transcriber = StreamingTranscriber(self.transcribe_audio, segmenter, on_partial)
+        text = transcriber.run(lambda: source.stream.read(source.CHUNK), timeout, cancel)
+        self.last_stream_stats = transcriber.stats
+        return text
+
+    @staticmethod
+    def audio_to_array(audio):
+        # Backends want mono float32 at 16 kHz. Audio captured at that rate and width is passed
+        # through untouched; otherwise speech_recognition resamples the PCM in memory.
+        raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def transcribe_audio(self, audio):
+        # Accepts sr.AudioData, a 16 kHz float32 array, or a path to a WAV file; returns the text
+        if isinstance(audio, sr.AudioData):
+            audio = self.audio_to_array(audio)
+        elif isinstance(audio, str):
+            audio = load_wav(audio)
+        return self.wait_for_model().transcribe(audio)
 
 # ================== GUI Interface ==================
+def on_ui_thread(method):
+    # Tk is single-threaded: calls from worker threads are queued for the Tk thread
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if threading.current_thread() is threading.main_thread():
+            return method(self, *args, **kwargs)
+        self.call_in_ui(method, self, *args, **kwargs)
+    return wrapper
+
+def latest_on_ui_thread(method):
+    # Like on_ui_thread, but queued calls replace each other: only the newest gets drawn
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if threading.current_thread() is threading.main_thread():
+            return method(self, *args, **kwargs)
+        self.dispatcher.post_latest(method.__name__, method, self, *args, **kwargs)
+    return wrapper
+
 class AssistantGUI:
     def __init__(self, root, core):
         self.root = root
         self.core = core
-        self.setup_gui()
+        self.dispatcher = UIDispatcher(root.after)
+        self.dispatcher.add_hook(lambda: self.core.jobs.poll(self.core.on_command_done))
         self.setup_styles()
-        
+        self.setup_gui()
+        self.dispatcher.start()
+
+    def call_in_ui(self, func, *args, **kwargs):
+        self.dispatcher.post(func, *args, **kwargs)
+
+    def ask_in_ui(self, func, *args, cancel=None, **kwargs):
+        # Runs a blocking dialog on the Tk thread and waits for its answer. A superseded
+        # command (cancel tripped) stops waiting and raises SearchCancelled.
+        if threading.current_thread() is threading.main_thread():
+            return func(*args, **kwargs)
+        answer = {}
+        done = threading.Event()
+
+        def run():
+            try:
+                answer['value'] = func(*args, **kwargs)
+            finally:
+                done.set()
+
+        self.dispatcher.post_modal(run)
+        while not done.wait(0.1):
+            if cancel is not None and cancel.cancelled:
+                raise SearchCancelled()
+        return answer.get('value')
+
     def setup_styles(self):
         self.style = ttk.Style()
         self.style.configure('Chat.TFrame', background='#e5e5ea')
@@ -231,25 +184,15 @@ class AssistantGUI:
         self.status_circle = self.status_indicator.create_oval(2, 2, 13, 13, fill="#86868b")
         self.status_indicator.pack(side=tk.LEFT)
 
+        self.voice_label = tk.Label(self.status_frame, text="Voice: loading...", bg="#f0f4f8",
+                                  fg="#86868b", font=("Segoe UI", 10))
+        self.voice_label.pack(side=tk.RIGHT, padx=10)
+
         # Chat Area
         self.chat_frame = ttk.Frame(self.root, style='Chat.TFrame')
         self.chat_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
-        self.chat_canvas = tk.Canvas(self.chat_frame, bg="#e5e5ea", highlightthickness=0)
-        self.scrollbar = ttk.Scrollbar(self.chat_frame, orient=tk.VERTICAL, 
-                                     command=self.chat_canvas.yview)
-        
-        self.scrollable_frame = tk.Frame(self.chat_canvas, bg="#e5e5ea")
-        self.chat_window = self.chat_canvas.create_window((0, 0), window=self.scrollable_frame, 
-                                                         anchor='nw')
-        
-        self.chat_canvas.configure(yscrollcommand=self.scrollbar.set)
-        self.scrollable_frame.bind("<Configure>", 
-                                  lambda e: self.chat_canvas.configure(scrollregion=self.chat_canvas.bbox("all")))
-        self.chat_canvas.bind("<Configure>", self.on_canvas_configure)
-
-        self.chat_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.transcript = ChatTranscript(self.chat_frame, self.message_font)
 
         # Input Section
         self.input_frame = tk.Frame(self.root, bg="#e5e5ea")
@@ -258,228 +201,181 @@ class AssistantGUI:
         self.entry = ttk.Entry(self.input_frame, font=("Segoe UI", 11))
         self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10), ipady=6)
 
-        self.mic_button = ttk.Button(self.input_frame, text="🎤", command=self.core.process_voice_input)
+        self.mic_button = ttk.Button(self.input_frame, text="🎤", command=lambda: self.core.submit_command(self.core.process_voice_input))
         self.mic_button.pack(side=tk.RIGHT, padx=5)
 
         self.send_button = ttk.Button(self.input_frame, text="Send", command=self.process_text_command)
         self.send_button.pack(side=tk.RIGHT)
 
-    def on_canvas_configure(self, event):
-        self.chat_canvas.itemconfig(self.chat_window, width=event.width)
+        self.correct_button = ttk.Button(self.input_frame, text="Not that", command=self.correct_last_command)
+        self.correct_button.pack(side=tk.RIGHT, padx=5)
 
+    @on_ui_thread
     def display_message(self, text, sender="user"):
-        message_frame = tk.Frame(self.scrollable_frame, bg="#f0f4f8", pady=5)
-        message_frame.pack(fill=tk.X, padx=10)
-
-        bubble_frame = tk.Frame(message_frame, bg="#dcf8c6" if sender == "user" else "#ffffff")
-        bubble_frame.pack(side=tk.RIGHT if sender == "user" else tk.LEFT, 
-                         anchor=tk.E if sender == "user" else tk.W, 
-                         padx=(50, 0) if sender == "user" else (0, 50))
-
-        if sender == "assistant":
-            avatar_label = tk.Label(bubble_frame, text="🤖", font=("Segoe UI", 14), bg="#ffffff")
-            avatar_label.pack(side=tk.LEFT, padx=(10, 5), pady=10)
-
-        message_label = tk.Label(bubble_frame, text=text, font=self.message_font,
-                                bg=bubble_frame["bg"], fg="#333333",
-                                wraplength=450, justify=tk.LEFT,
-                                padx=10, pady=10)
-        message_label.pack(side=tk.RIGHT if sender == "user" else tk.LEFT)
-
-        self.root.update_idletasks()
-        self.chat_canvas.yview_moveto(1.0)
+        self.transcript.append(text, sender)
 
+    @latest_on_ui_thread
     def update_status(self, text, status):
+        # No forced repaint: Tk redraws at idle, so back-to-back changes cost one repaint
         color_map = {"idle": "#86868b", "active": "#4CAF50", "processing": "#FFC107"}
         self.status_label.config(text=text)
         self.status_indicator.itemconfig(self.status_circle, fill=color_map.get(status, "#86868b"))
-        self.root.update()
 
-    def process_text_command(self):
-        command = self.entry.get().strip()
+    def ask_choice(self, question, options, cancel=None):
+        # Modal row of buttons; returns the chosen value, or None if dismissed
+        return self.ask_in_ui(self._choice_dialog, question, options, cancel, cancel=cancel)
+
+    def _choice_dialog(self, question, options, cancel=None):
+        # cancel: the dialog closes itself once the command asking is superseded
+        answer = {}
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Zuri")
+        dialog.transient(self.root)
+
+        def choose(value):
+            answer['value'] = value
+            dialog.destroy()
+
+        tk.Label(dialog, text=question, font=self.message_font, padx=10, pady=10).pack()
+        for value, label in options:
+            ttk.Button(dialog, text=label, command=lambda v=value: choose(v)).pack(fill=tk.X, padx=10, pady=2)
+        ttk.Button(dialog, text="None of these", command=lambda: choose(None)).pack(fill=tk.X, padx=10, pady=(2, 10))
+        dialog.protocol("WM_DELETE_WINDOW", lambda: choose(None))
+
+        def check_cancel():
+            if not dialog.winfo_exists():
+                return
+            if cancel.cancelled:
+                choose(None)
+            else:
+                dialog.after(100, check_cancel)
+
+        if cancel is not None:
+            dialog.after(100, check_cancel)
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+        return answer.get('value')
+
+    @latest_on_ui_thread
+    def set_voice_state(self, text, ready):
+        self.voice_label.config(text=text, fg="#4CAF50" if ready else "#86868b")
+
+    def process_text_command(self, command=None):
+        if command is None:
+            command = self.entry.get().strip()
+            self.entry.delete(0, tk.END)
         if not command:
             return
-        self.entry.delete(0, tk.END)
         self.display_message(command, sender="user")
-        threading.Thread(target=self.core.process_command, args=(command,)).start()
+        self.core.submit_command(self.core.process_command, command)
+
+    def correct_last_command(self):
+        # Same as typing "No, I meant ...", with the intents offered as buttons
+        intent = self._choice_dialog("What did you mean by the last command?",
+                                     [(intent, intent.replace('_', ' ').capitalize())
+                                      for intent in self.core.processor.intents()])
+        if intent:
+            self.process_text_command(f"No, I meant {intent.replace('_', ' ')}")
 
 # ================== Main Application ==================
-class AssistantCore:
+class AssistantCore(AssistantEngine):
+    # The desktop front-end: the engine's replies go to the chat and the speaker, and its
+    # questions become dialogs. Commands run on a worker pool so Tk never waits on them.
+    can_ask = True
+
     def __init__(self, root):
         self.root = root
-        self.db = DatabaseManager()
+        self.jobs = CommandEngine()
         self.gui = AssistantGUI(root, self)
         self.speech = SpeechManager()
-        self.processor = CommandProcessor()
-        self.file_manager = FileManager()
-        self.current_user = None
-        
-        self.setup_user()
+        super().__init__()
+        self.start()
+        self.speech.load_model_async(on_done=self.on_speech_model_loaded)
+        root.protocol("WM_DELETE_WINDOW", self.quit)
         self.greet_user()
 
-    def setup_user(self):
-        session = self.db.get_session()
-        self.current_user = session.query(User).first()
-        if not self.current_user:
-            self.current_user = User(username="DefaultUser")
-            session.add(self.current_user)
-            session.commit()
-        session.close()
-
-    def log_command(self, command_text, intent):
-        session = self.db.get_session()
-        try:
-            history_entry = CommandHistory(
-                command_text=command_text,
-                intent=intent,
-                user=self.current_user
-            )
-            session.add(history_entry)
-            session.commit()
-        except Exception as e:
-            session.rollback()
-        finally:
-            session.close()
+    def quit(self):
+        self.jobs.shutdown()
+        self.speech.tts.stop()
+        self.close()
+        self.root.destroy()
+
+    def on_speech_model_loaded(self, error):
+        if error is None:
+            self.gui.set_voice_state("Voice: ready", True)
+        else:
+            self.gui.set_voice_state("Voice: unavailable", False)
 
     def greet_user(self):
-        self.speak("Hi, I'm Zuri, your virtual assistant. How can I help you?")
+        self.speak(GREETING)
 
-    def speak(self, text):
+    def on_reply(self, text):
         self.gui.display_message(text, sender="assistant")
-        self.root.after(200, lambda: self.speech.speak(text))
+        self.speech.speak(text)
 
-    def process_voice_input(self):
-        self.gui.update_status("Listening...", "active")
+    def update_status(self, text, status):
+        self.gui.update_status(text, status)
+
+    def ask_choice(self, question, options):
+        return self.gui.ask_choice(question, options, getattr(self._context, 'cancel', None))
+
+    def ask_directory(self, title):
+        return self.gui.ask_in_ui(filedialog.askdirectory, title=title, cancel=getattr(self._context, 'cancel', None))
+
+    def submit_command(self, func, *args):
+        # Commands run on the worker pool; a new one supersedes (cancels) the last,
+        # and whatever is still being said about it
+        self.speech.interrupt()
+        if self.jobs.submit(func, *args, group='gui', supersede=True) is None:
+            self.speak("I'm still busy with earlier commands, please try again in a moment.")
+
+    def on_command_done(self, job):
+        # Runs on the Tk thread for every finished job
+        if job.state == 'timeout':
+            self.speak("That took too long, so I stopped it.")
+        elif job.state == 'failed':
+            self.speak(f"Error processing command: {job.error}")
+
+    def process_voice_input(self, cancel=None):
+        self.update_status("Listening...", "active")
         try:
-            with sr.Microphone() as source:
-                self.speak("I'm listening...")
+            # The prompt finishes before the microphone opens, or the noise calibration (and
+            # the start of the recording) would hear the assistant's own voice
+            self.gui.display_message(LISTENING_PROMPT, sender="assistant")
+            self.speech.speak(LISTENING_PROMPT).wait(PROMPT_WAIT)
+            # Capturing at the ASR sample rate means the PCM buffer needs no resampling at all
+            with sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=STREAM_CHUNK) as source:
                 self.speech.recognizer.adjust_for_ambient_noise(source)
-                audio = self.speech.recognizer.listen(source, timeout=15)
-                
-                with open("temp_audio.wav", "wb") as f:
-                    f.write(audio.get_wav_data())
-                
-                self.gui.update_status("Processing...", "processing")
-                result = self.speech.transcribe_audio("temp_audio.wav")
-                command = result["text"]
+                prediction = None
+                if STREAMING_VOICE:
+                    early = {}
+
+                    def on_partial(text):
+                        # Classify while the user is still talking; reused if the final text matches
+                        early['text'], early['prediction'] = text, self.processor.rank(text, 1)[0]
+                        self.update_status(f"Heard: {text}", "active")
+
+                    command = self.speech.listen_streaming(source, on_partial=on_partial, cancel=cancel)
+                    if early.get('text') == command:
+                        prediction = early['prediction']
+                else:
+                    audio = self.speech.recognizer.listen(source, timeout=15)
+                    if not self.speech.model_ready:
+                        # Only the part of the model load that is still outstanding is paid here
+                        self.update_status("Loading speech model...", "processing")
+                        self.speech.wait_for_model(cancel=cancel)
+                    self.update_status("Processing...", "processing")
+                    command = self.speech.transcribe_audio(audio)
                 self.gui.display_message(f"{command} (voice)", sender="user")
-                self.process_command(command)
+                self.process_command(command, prediction, cancel=cancel)
                 
+        except SearchCancelled:
+            # A newer command superseded this one while it was listening
+            pass
         except Exception as e:
             self.gui.display_message(f"Voice input error: {str(e)}", sender="assistant")
         finally:
-            self.gui.update_status("Ready", "idle")
-            if os.path.exists("temp_audio.wav"):
-                os.remove("temp_audio.wav")
-
-    def process_command(self, command):
-        try:
-            self.gui.update_status("Analyzing...", "processing")
-            intent = self.processor.classify_intent(command)
-            self.log_command(command, intent)
-            self.perform_action(intent, command)
-        except Exception as e:
-            self.speak(f"Error processing command: {str(e)}")
-        finally:
-            self.gui.update_status("Ready", "idle")
-
-    def perform_action(self, intent, command):
-        self.gui.update_status("Working...", "processing")
-        filename = self.processor.extract_filename(command)
-        folder_name = self.processor.extract_folder_name(command)
-        
-        # Handle filename extraction failure
-        if intent in ['open_file', 'open_media', 'delete_file', 'delete_forever', 'copy_file', 'move_file'] and not filename:
-            self.speak("Could not determine the filename from your command.")
-            return
-        
-        try:
-            if intent in ['open_file', 'open_media']:
-                path = self.file_manager.find_file_or_folder(filename)
-                if path and self.file_manager.open_path(path):
-                    self.speak(f"Opening {os.path.basename(path)}")
-                else:
-                    self.speak(f"File '{filename}' not found")
-
-            elif intent == 'open_folder':
-                if not folder_name:
-                    folder_name = command.replace("open folder", "").strip()
-                
-                if 'music' in folder_name.lower():
-                    music_path = os.path.join(os.path.expanduser('~'), 'Music')
-                    if os.path.exists(music_path):
-                        self.file_manager.open_path(music_path)
-                        self.speak("Opening your Music folder")
-                        return
-                
-                path = self.file_manager.find_file_or_folder(folder_name, 'folder')
-                if path and self.file_manager.open_path(path):
-                    self.speak(f"Opening folder: {os.path.basename(path)}")
-                else:
-                    self.speak(f"Folder '{folder_name}' not found")
-
-            elif intent == 'play_music':
-                path = self.file_manager.find_file_or_folder('.mp3')
-                if path and self.file_manager.open_path(path):
-                    self.speak(f"Now playing: {os.path.basename(path)}")
-                else:
-                    self.speak("No music files found")
-
-            elif intent == 'play_movie':
-                path = self.file_manager.find_file_or_folder('.mp4')
-                if path and self.file_manager.open_path(path):
-                    self.speak(f"Now playing: {os.path.basename(path)}")
-                else:
-                    self.speak("No video files found")
-
-            elif intent == 'search_file':
-                path = self.file_manager.find_file_or_folder(filename)
-                if path:
-                    self.speak(f"Found at: {path}")
-                else:
-                    self.speak(f"File '{filename}' not found")
-
-            elif intent == 'delete_file':
-                path = self.file_manager.find_file_or_folder(filename)
-                if path:
-                    success, message = self.file_manager.delete_file(path)
-                    self.speak(message if success else "Deletion failed")
-                else:
-                    self.speak(f"File '{filename}' not found")
-
-            elif intent == 'delete_forever':
-                path = self.file_manager.find_file_or_folder(filename)
-                if path:
-                    success, message = self.file_manager.delete_file(path, permanent=True)
-                    self.speak(message if success else "Permanent deletion failed")
-                else:
-                    self.speak(f"File '{filename}' not found")
-
-            elif intent == 'copy_file':
-                destination = filedialog.askdirectory(title="Select destination for copy")
-                if filename and destination:
-                    path = self.file_manager.find_file_or_folder(filename)
-                    if path:
-                        success, message = self.file_manager.copy_file(path, destination)
-                        self.speak(message if success else "Copy failed")
-                    else:
-                        self.speak(f"File '{filename}' not found")
-
-            elif intent == 'move_file':
-                destination = filedialog.askdirectory(title="Select destination for move")
-                if filename and destination:
-                    path = self.file_manager.find_file_or_folder(filename)
-                    if path:
-                        success, message = self.file_manager.move_file(path, destination)
-                        self.speak(message if success else "Move failed")
-                    else:
-                        self.speak(f"File '{filename}' not found")
-
-            else:
-                self.speak("Command not recognized")
-
-        except Exception as e:
-            self.speak(f"Operation failed: {str(e)}")
+            self.update_status("Ready", "idle")
 
 def main():
     root = tk.Tk()
@@ -487,4 +383,4 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from file_search import SearchCancelled
+
+FRAME_MS = 30
+
+
+def frame_rms(frame):
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+
+
+class EnergyVAD:
+    # Same RMS measure speech_recognition uses for Recognizer.energy_threshold,
+    # so the threshold from adjust_for_ambient_noise carries over unchanged
+    def __init__(self, threshold=300):
+        self.threshold = threshold
+
+    def is_speech(self, frame):
+        return frame_rms(frame) > self.threshold
+
+
+class UtteranceSegmenter:
+    # Splits a stream of 16-bit PCM frames into one utterance. A short pause closes a
+    # chunk (worth transcribing early); a long pause or the length cap ends the utterance.
+    def __init__(self, vad, sample_rate=16000, frame_ms=FRAME_MS, chunk_pause_ms=240,
+                 end_pause_ms=600, pre_roll_ms=210, max_seconds=15):
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.chunk_pause = max(1, chunk_pause_ms // frame_ms)
+        self.end_pause = max(1, end_pause_ms // frame_ms)
+        self.pre_roll = max(1, pre_roll_ms // frame_ms)
+        self.max_frames = max_seconds * 1000 // frame_ms
+        self.frames = []
+        self.started = False
+        self.silent = 0
+        self.chunk_open = False
+
+    def feed(self, frame):
+        speech = self.vad.is_speech(frame)
+        self.frames.append(frame)
+        if not self.started:
+            if not speech:
+                # Keep a little audio before the onset so the first syllable is not clipped
+                del self.frames[:-self.pre_roll]
+                return None
+            self.started = True
+        if speech:
+            self.silent = 0
+            self.chunk_open = True
+            return 'end' if len(self.frames) >= self.max_frames else None
+        self.silent += 1
+        if self.silent >= self.end_pause or len(self.frames) >= self.max_frames:
+            return 'end'
+        if self.silent >= self.chunk_pause and self.chunk_open:
+            self.chunk_open = False
+            return 'chunk'
+        return None
+
+    def audio(self):
+        # Trailing silence adds decode time without adding words
+        frames = self.frames[:len(self.frames) - self.silent] if self.silent else self.frames
+        return np.frombuffer(b''.join(frames), dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class StreamingTranscriber:
+    # Transcribes the utterance-so-far at every chunk boundary on a worker thread. When
+    # speech ends, the last chunk has usually been transcribed already, so the final
+    # text costs nothing beyond the end-of-speech pause.
+    def __init__(self, transcribe, segmenter, on_partial=None):
+        self.transcribe = transcribe
+        self.segmenter = segmenter
+        self.on_partial = on_partial
+        self.stats = {}
+
+    def run(self, read_frame, timeout=15, cancel=None):
+        # cancel: a CancelToken checked every frame, so a superseded command stops listening
+        worker = ThreadPoolExecutor(max_workers=1)
+        pending = None
+        started_at = time.monotonic()
+        try:
+            while True:
+                if cancel is not None and cancel.cancelled:
+                    raise SearchCancelled()
+                event = self.segmenter.feed(read_frame())
+                if not self.segmenter.started and time.monotonic() - started_at > timeout:
+                    raise TimeoutError("No speech detected")
+                if event == 'chunk' and (pending is None or pending.done()):
+                    audio = self.segmenter.audio()
+                    pending = worker.submit(self._partial, audio)
+                elif event == 'end':
+                    break
+            ended_at = time.monotonic()
+            audio = self.segmenter.audio()
+            text = None
+            if pending is not None:
+                samples, partial = pending.result()
+                if samples == len(audio):
+                    text = partial
+            reused = text is not None
+            if not reused:
+                text = self.transcribe(audio)
+            self.stats = {
+                'speech_seconds': len(audio) / self.segmenter.sample_rate,
+                'end_to_text_seconds': time.monotonic() - ended_at,
+                'reused_partial': reused,
+            }
+            return text
+        finally:
+            worker.shutdown(wait=False)
+
+    def _partial(self, audio):
+        text = self.transcribe(audio)
+        if self.on_partial and text:
+            self.on_partial(text)
+        return len(audio), text